@@ -115,5 +115,6 @@ class ImplementationError(RuntimeError):
 
 DFLT_CHARSET     = 'utf-8'
 DFLT_FETCH_INT   = 1.0
-DFLT_HTML_PARSER = 'lxml'
-#DFLT_HTML_PARSER = 'html.parser'  # sometimes treats <br /> as an opening tag--WRONG!!!
+DFLT_FETCH_CONC  = 1
+DFLT_PARSE_WRKRS = 1
+DFLT_COMPRESS    = False
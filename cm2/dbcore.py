@@ -3,10 +3,18 @@
 """Core configuration and definitions for database stuff.
 """
 
+import json
+from copy import deepcopy
 from datetime import datetime, date
+from collections.abc import Iterable
 
-from peewee import Model, DateTimeField
+import msgpack
+from peewee import Model, DateTimeField, BlobField, FieldAccessor, chunked
 from playhouse.sqlite_ext import SqliteExtDatabase
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .core import cfg, DataFile, ConfigError
 
@@ -34,22 +42,111 @@ def date_str(ts: int = None) -> str:
     dt = date.fromtimestamp(ts) if ts else date.today()
     return str(dt)
 
+#################
+# Custom Fields #
+#################
+
+def json_default(obj):
+    """Serialize tuples (e.g. named tuples, which orjson does not support) as lists, same
+    as the standard `json` module.
+    """
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+if orjson:
+    def json_dumps(obj) -> str:
+        """Serializer for `JSONField` (using orjson, if available)
+        """
+        return orjson.dumps(obj, default=json_default).decode()
+
+    json_loads = orjson.loads
+else:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+class SnapshotAccessor(FieldAccessor):
+    """Accessor that records a copy of the field value on first access (per instance), so
+    that in-place modifications of mutable values can be detected (see `MsgPackField`)
+    """
+    def __get__(self, instance, instance_type=None):
+        if instance is None:
+            return self.field
+        value = instance.__data__.get(self.name)
+        snapshots = instance.__dict__.setdefault('_snapshots', {})
+        if self.name not in snapshots:
+            snapshots[self.name] = deepcopy(value)
+        return value
+
+class MsgPackField(BlobField):
+    """Field for storing structured data (e.g. lists of strings) serialized as msgpack,
+    which is more compact and faster to encode/decode than JSON (use `JSONField` instead
+    if the data needs to be queried or inspected using SQL).  Use `is_modified()` to check
+    for changes, since values may be modified in place (not marked as dirty).
+    """
+    accessor_class = SnapshotAccessor
+
+    def is_modified(self, instance: Model) -> bool:
+        """Return True if the value for the specified instance was assigned, or modified
+        in place since it was first accessed (or `reset_modified()` was called).
+        """
+        if self.name in instance._dirty:
+            return True
+        snapshots = instance.__dict__.get('_snapshots', {})
+        if self.name not in snapshots:
+            return False
+        return snapshots[self.name] != instance.__data__.get(self.name)
+
+    def reset_modified(self, instance: Model) -> None:
+        """Reset in-place modification tracking for the specified instance (e.g. after the
+        value has been saved).
+        """
+        instance.__dict__.get('_snapshots', {}).pop(self.name, None)
+    def db_value(self, value):
+        if value is None:
+            return None
+        return super().db_value(msgpack.packb(value))
+
+    def python_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # legacy JSON text value (not yet converted by `schema.migrate_msgpack`)
+            return json_loads(value)
+        return msgpack.unpackb(value, raw=False)
+
 #############
 # BaseModel #
 #############
 
-pragmas = {'journal_mode'            : 'wal',
-           'cache_size'              : -1 * 64000,  # 64MB
-           'foreign_keys'            : 1,
-           'ignore_check_constraints': 0,
-           'synchronous'             : 0}
+DFLT_PRAGMAS = {'journal_mode'            : 'wal',
+                'cache_size'              : -1 * 64000,  # 64MB
+                'mmap_size'               : 1 << 30,     # 1GB
+                'temp_store'              : 'memory',
+                'foreign_keys'            : 1,
+                'ignore_check_constraints': 0,
+                'synchronous'             : 0}
+
+# individual pragmas may be overridden in config (e.g. `journal_mode: delete` for
+# environments that do not support WAL)
+pragmas = DFLT_PRAGMAS | (SQLITE.get('pragmas') or {})
 
 db_file = SQLITE.get('db_file') or DFLT_DB
-db = SqliteExtDatabase(DataFile(db_file), pragmas)
+db = SqliteExtDatabase(DataFile(db_file), pragmas=pragmas)
+
+# max number of host parameters in a single statement (legacy SQLite default), which
+# determines the batch size for bulk inserts
+SQLITE_MAX_VARS = 999
 
 class BaseModel(Model):
     """Base model for this module, with defaults and system columns
     """
+    # additional index DDL (e.g. partial or covering indexes, which cannot be expressed
+    # in `Meta.indexes`), executed after the table is created
+    EXTRA_INDEXES: list[str] = []
+    # other DDL (e.g. triggers), executed after the table and extra indexes are created
+    EXTRA_DDL: list[str] = []
+
     # system columns
     created_at    = DateTimeField(default=now_str)
     updated_at    = DateTimeField()
@@ -61,6 +158,58 @@ class BaseModel(Model):
             self.updated_at = now_str()
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def prep_bulk_row(cls, row: dict) -> dict:
+        """Return copy of row (field values) for bulk insert, with derived fields filled in
+        (as would be done by `save()`).  Subclasses that derive fields in `save()` should
+        extend this accordingly.
+        """
+        row = dict(row)
+        if not row.get('created_at'):
+            row['created_at'] = now_str()
+        if not row.get('updated_at'):
+            row['updated_at'] = row['created_at']
+        return row
+
+    @classmethod
+    def bulk_insert(cls, rows: Iterable[dict], batch_size: int = None,
+                    ignore_conflicts: bool = False) -> int:
+        """Insert rows (dicts of field values) for this model, using batched INSERT
+        statements within a single transaction.  This should be used (rather than `save()`
+        or `create()`, which is the slow per-row path) for loading large numbers of records.
+        Rows must be keyed by field name (e.g. "person", not "person_id"), but may omit
+        fields with defaults, as well as fields derived by `save()` (see `prep_bulk_row`).
+
+        ``batch_size`` defaults to the largest number of rows that fits within the SQLite
+        parameter limit.  If ``ignore_conflicts`` is specified, rows that violate uniqueness
+        constraints are silently skipped.  Return the number of rows processed.
+        """
+        rows = [cls.prep_bulk_row(row) for row in rows]
+        if not rows:
+            return 0
+
+        # note that insert_many determines columns from the first row, so we make sure all
+        # rows have a complete set of values (using field defaults, where available)
+        fields = {}
+        for row in rows:
+            fields |= dict.fromkeys(row)
+        defaults = {}
+        for name in fields:
+            field = cls._meta.fields.get(name)
+            default = field.default if field else None
+            defaults[name] = default() if callable(default) else default
+        rows = [defaults | row for row in rows]
+        if not batch_size:
+            batch_size = max(1, SQLITE_MAX_VARS // len(fields))
+
+        with db.atomic():
+            for batch in chunked(rows, batch_size):
+                query = cls.insert_many(batch)
+                if ignore_conflicts:
+                    query = query.on_conflict_ignore()
+                query.execute()
+        return len(rows)
+
     class Meta:
         database = db
         legacy_table_names = False
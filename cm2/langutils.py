@@ -3,6 +3,8 @@
 """Miscellaneous language processing functions.
 """
 
+from functools import lru_cache
+
 from unidecode import unidecode
 
 def count_non_ascii(s: str) -> int:
@@ -15,3 +17,7 @@ def norm(s: str) -> str:
     and diacritics, as well as downcase).
     """
     return unidecode(s).lower()
+
+# memoized version of `norm`, for bulk processing (where the same name strings recur
+# frequently across sources and loads)
+norm_cached = lru_cache(maxsize=1 << 17)(norm)
@@ -9,24 +9,40 @@ will be far less consistent, so will do more fuzzy matching when processing thos
 """
 
 import json
-from collections.abc import Generator, Iterable
-from typing import TextIO, NamedTuple
+from collections.abc import Generator, Iterable, Iterator, Callable
+from typing import IO, NamedTuple, ClassVar, TYPE_CHECKING
 from datetime import date
-from time import sleep
-from glob import glob
+from time import sleep, monotonic
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+import asyncio
 from importlib import import_module
 import os
+import gzip
+import re as stdre
+from string import ascii_lowercase
 
 import regex as re
-import requests
-from bs4 import BeautifulSoup
-from peewee import IntegrityError
+import lxml.html
+from lxml.html import HtmlElement
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from peewee import IntegrityError, chunked
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+# note that `requests` (and `urllib3`) are imported when first needed, since they are
+# relatively expensive to load, and not needed for loading data or CLI errors
+if TYPE_CHECKING:
+    import requests
 
 from .core import (cfg, log, DataFile, ConfigError, ImplementationError, DFLT_CHARSET,
-                   DFLT_FETCH_INT, DFLT_HTML_PARSER)
-from .langutils import norm
-from .dbcore import now_str, date_str
-from .schema import (Person, PersonMeta, PersonName, Work, WorkMeta, WorkName,
+                   DFLT_FETCH_INT, DFLT_FETCH_CONC, DFLT_PARSE_WRKRS, DFLT_COMPRESS)
+from .langutils import norm_cached
+from .dbcore import db, now_str, date_str, SQLITE_MAX_VARS
+from .schema import (Source, Person, PersonMeta, PersonName, Work, WorkMeta, WorkName,
                      EntityOp, Conflict, Failure)
 
 REFDATA_DIR  = 'refdata'
@@ -48,38 +64,177 @@ class LoadCtx(NamedTuple):
     source_date: str  # datestamp of the data
     load_ts:     str  # timestamp for load operation
 
-SegData = BeautifulSoup | dict
+# note that "html-fast" data (selectolax `LexborHTMLParser`) is not represented here, since
+# selectolax is an optional dependency (imported only when needed)
+SegData = HtmlElement | etree.iterparse | dict
+
+# data formats that are read from segment files in binary mode
+BINARY_FORMATS = ['html-stream', 'html-fast', 'json']
+
+# chunk size for streaming fetched segment data to disk
+WRITE_CHUNK_SIZE = 1 << 16
+
+# max number of segment writes in flight (i.e. overlapping with subsequent fetches)
+WRITE_WORKERS = 2
+
+# suffix for compressed segment files (see `compress_segs` config parameter), and the
+# compression level used (good tradeoff between speed and size for HTML)
+GZIP_SUFFIX = '.gz'
+GZIP_LEVEL  = 3
+
+def write_seg(seg_path: str, seg_data: 'requests.Response | bytes') -> int:
+    """Write fetched segment data to the specified file.  If ``seg_data`` is a (streamed)
+    response, the body is written in chunks as it is read from the connection, without
+    being read fully into memory (or decoded to text, which is left to the parser).
+
+    The data is written gzip-compressed if ``seg_path`` has the ".gz" suffix; in this case,
+    a response body received with gzip content encoding is written as is (without being
+    decompressed and recompressed).  Return the number of bytes written to disk.
+    """
+    compress = seg_path.endswith(GZIP_SUFFIX)
+    if not isinstance(seg_data, bytes):  # streamed response
+        with seg_data:
+            if compress and seg_data.headers.get('Content-Encoding') == 'gzip':
+                with open(seg_path, 'wb') as f:
+                    while chunk := seg_data.raw.read(WRITE_CHUNK_SIZE, decode_content=False):
+                        f.write(chunk)
+                    return f.tell()
+            # note that `iter_content` takes care of any content encoding (e.g. gzip)
+            if compress:
+                with gzip.open(seg_path, 'wb', compresslevel=GZIP_LEVEL) as f:
+                    for chunk in seg_data.iter_content(WRITE_CHUNK_SIZE):
+                        f.write(chunk)
+                return os.path.getsize(seg_path)
+            with open(seg_path, 'wb') as f:
+                for chunk in seg_data.iter_content(WRITE_CHUNK_SIZE):
+                    f.write(chunk)
+                return f.tell()
+
+    if compress:
+        seg_data = gzip.compress(seg_data, GZIP_LEVEL)
+    # content already in memory, so write it unbuffered (single open/write/close)
+    fd = os.open(seg_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with memoryview(seg_data) as buf:
+            nbytes = 0
+            while nbytes < len(buf):
+                nbytes += os.write(fd, buf[nbytes:])
+    finally:
+        os.close(fd)
+    return nbytes
+
+# suffix for segment metadata sidecar files (note that this must not match any segment
+# file suffix, e.g. ".json")
+SEG_META_SUFFIX = '.meta'
+
+# response headers saved in segment metadata, mapped to corresponding conditional request
+# headers
+VALIDATOR_HEADERS = {'ETag':          'If-None-Match',
+                     'Last-Modified': 'If-Modified-Since'}
+
+def write_seg_meta(seg_path: str, resp_headers: dict) -> None:
+    """Save cache validators (e.g. ETag) from the response for a fetched segment in its
+    metadata sidecar file.  Any existing sidecar file is removed if there are none.
+    """
+    meta = {hdr: resp_headers[hdr] for hdr in VALIDATOR_HEADERS if hdr in resp_headers}
+    meta_path = seg_path + SEG_META_SUFFIX
+    if not meta:
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        return
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+def cond_headers(seg_path: str) -> dict[str, str]:
+    """Return conditional request headers (e.g. If-None-Match) for refetching a segment,
+    based on its saved metadata.  Empty dict is returned if the segment file or metadata
+    does not exist.
+    """
+    meta_path = seg_path + SEG_META_SUFFIX
+    if not (os.path.exists(seg_path) and os.path.exists(meta_path)):
+        return {}
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return {VALIDATOR_HEADERS[hdr]: val for hdr, val in meta.items() if hdr in VALIDATOR_HEADERS}
+
+def select_one(elem: HtmlElement, selector: str) -> HtmlElement | None:
+    """Return the first element matching the CSS ``selector`` under ``elem`` (or ``None``
+    if there are no matches).
+    """
+    matches = elem.cssselect(selector)
+    return matches[0] if matches else None
 
 TOKEN_VARS = ['category', 'key', 'role']
 
+# precompiled patterns for token replacement and key expansion (note that only the token
+# pattern requires `regex`, for Unicode properties; ASCII-only patterns use stdlib `re`,
+# which has lower per-match overhead)
+TOKEN_RE       = re.compile(r'(\<[\p{Lu}\d_]+\>)')
+ALPHA_RANGE_RE = stdre.compile(r'([a-z])-([a-z])')
+NUM_RANGE_RE   = stdre.compile(r'(\d+)-(\d+)')
+ORD_A          = ord('a')
+
+# connection pooling and retry policy for the HTTP session
+HTTP_POOL_SIZE    = 16
+HTTP_RETRIES      = 3
+HTTP_BACKOFF      = 0.3
+HTTP_RETRY_STATUS = (502, 503, 504)
+
+# cache for `Refdata.new` (see note there)
+_instances: dict[tuple[type, str], 'Refdata'] = {}
+
 class Refdata:
     """Abstract base class for a reference data source.
+
+    Note that config parameters (and internal state) are declared as slots, so subclasses
+    should also declare ``__slots__`` (generally empty); defaults for optional parameters
+    are set in `__init__`.
     """
+    __slots__ = ('module_path', 'base_class', 'charset', 'fetch_interval',
+                 'fetch_concurrency', 'parse_workers', 'compress_segs', 'http_headers',
+                 'name', 'full_name', 'subclass', 'dflt_keys', 'categories', 'fetch_url',
+                 'fetch_params', 'fetch_format', 'data_format',
+                 '_tmpl_cache', '_next_ok', '_session')
+
     # base config parameters
     module_path:    str
     base_class:     str
-    charset:        str            = DFLT_CHARSET
-    fetch_interval: float          = DFLT_FETCH_INT
-    html_parser:    str            = DFLT_HTML_PARSER
-    http_headers:   dict[str, str] = {}
+    charset:        str
+    fetch_interval: float
+    fetch_concurrency: int
+    parse_workers:  int
+    compress_segs:  bool
+    http_headers:   dict[str, str]
 
     # source config parameters
     name:           str
     full_name:      str
     subclass:       str
-    dflt_keys:      str            = None
+    dflt_keys:      str
     categories:     dict[str, dict[str, str]]  # category: {param: value, ...}
     fetch_url:      str
-    fetch_params:   dict[str, str] = {}
+    fetch_params:   dict[str, str]
     fetch_format:   str
     data_format:    str
 
+    # registry of subclasses, by class name (see `__init_subclass__`)
+    _registry:      ClassVar[dict[str, type['Refdata']]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Refdata._registry[cls.__name__] = cls
+
     @classmethod
     def new(cls, source_name: str, **kwargs) -> 'Refdata':
         """Return instantiated Refdata subclass instance.  Additional kwargs are shallow
         parameters overrides on top of base and source-specific configuration (supported,
         but not generally expected).
+
+        Note that instances created without overrides are cached (by class and source),
+        so that repeated calls reuse the same instance (and its HTTP session).
         """
+        if not kwargs and (refdata := _instances.get((cls, source_name))):
+            return refdata
         if source_name not in sources:
             raise RuntimeError(f"Refdata source '{source_name}' not known")
         source_cfg   = {'name': source_name} | base_cfg | sources[source_name] | kwargs
@@ -90,22 +245,86 @@ class Refdata:
         if module_path:
             module = import_module(module_path)
             refdata_class = getattr(module, class_name)
-        else:
-            refdata_class = globals()[class_name]
+        elif not (refdata_class := Refdata._registry.get(class_name)):
+            raise ConfigError(f"Subclass '{class_name}' not known for source '{source_name}'")
         # ATTENTION: refdata_class and cls must be loaded from same module for this check
         # to work!
         if not issubclass(refdata_class, cls):
             raise ConfigError(f"'{refdata_class.__name__}' not subclass of '{cls.__name__}'")
 
-        return refdata_class(**source_cfg)
+        refdata = refdata_class(**source_cfg)
+        if not kwargs:
+            _instances[(cls, source_name)] = refdata
+        return refdata
 
     def __init__(self, **kwargs):
         """Note that caller is expected to pass in the appropriate parameters from the
         config file (plus any instantiation overrides).
         """
+        self.charset           = DFLT_CHARSET
+        self.fetch_interval    = DFLT_FETCH_INT
+        self.fetch_concurrency = DFLT_FETCH_CONC
+        self.parse_workers     = DFLT_PARSE_WRKRS
+        self.compress_segs     = DFLT_COMPRESS
+        self.http_headers      = {}
+        self.dflt_keys         = None
+        self.fetch_params      = {}
         for key, value in kwargs.items():
-            setattr(self, key, value)
-        pass  # TEMP: for debugging!!!
+            try:
+                setattr(self, key, value)
+            except AttributeError:
+                raise ConfigError(f"Unknown config parameter '{key}'") from None
+        self._tmpl_cache = {}
+        self._next_ok = 0.0  # earliest (monotonic) time for the next fetch request
+        self._session = None
+
+    def __enter__(self) -> 'Refdata':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the HTTP session (if created), releasing pooled connections.
+        """
+        if self._session:
+            self._session.close()
+            self._session = None
+
+    def _rate_limit_delay(self) -> float:
+        """Reserve the next fetch request slot (spaced by ``fetch_interval``), and return
+        the number of seconds to wait before sending the request.  Note that time already
+        spent since the previous request (e.g. waiting for the response) counts towards the
+        interval.
+        """
+        now = monotonic()
+        delay = max(0.0, self._next_ok - now)
+        self._next_ok = max(now, self._next_ok) + self.fetch_interval
+        return delay
+
+    @property
+    def session(self) -> 'requests.Session':
+        """HTTP session for this instance (created on first use), which pools connections
+        across fetches, retries on transient server errors, and sends ``http_headers`` with
+        each request.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util import Retry
+
+            # note that the final response is returned (rather than raising) when retries
+            # are exhausted, so that the caller can report the status code
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+                          status_forcelist=HTTP_RETRY_STATUS, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                                  max_retries=retry)
+            sess = requests.Session()
+            sess.mount('https://', adapter)
+            sess.mount('http://', adapter)
+            sess.headers.update(self.http_headers)
+            self._session = sess
+        return self._session
 
     def valid_key(self, key: str | None) -> bool:
         """A fetch key must be be a single lowercase letter (or ``None`` indicating all
@@ -113,7 +332,7 @@ class Refdata:
         """
         if key is None:
             return True
-        return len(key) == 1 and ord(key) in range(ord('a'), ord('z') + 1)
+        return isinstance(key, str) and len(key) == 1 and 'a' <= key <= 'z'
 
     def expand_keys(self, keys: str | None) -> Iterable[str | None]:
         """
@@ -121,99 +340,271 @@ class Refdata:
         if keys is None:
             return [keys]
 
-        m = re.fullmatch(r'([a-z])-([a-z])', keys.lower())
+        m = ALPHA_RANGE_RE.fullmatch(keys.lower())
         if m and m.group(1) <= m.group(2):
-            return (chr(cc) for cc in range(ord(m.group(1)), ord(m.group(2)) + 1))
+            # note that iterating over the string slice yields the individual letters
+            return ascii_lowercase[ord(m.group(1)) - ORD_A:ord(m.group(2)) - ORD_A + 1]
         else:
             return keys.split(',')
 
+    def template(self, s: str) -> Callable[..., str]:
+        """Return function for replacing tokens in ``s`` with values from kwargs or instance
+        variables.  Templates are compiled (once per instance) into a specialized function
+        that builds the result string with a single f-string.
+        """
+        if tmpl := self._tmpl_cache.get(s):
+            return tmpl
+
+        # note that tokens are at the odd indexes (since captured by the split pattern);
+        # token values are passed to the generated function positionally (as `_0`, `_1`,
+        # etc.), so token names do not need to be valid identifiers
+        parts = TOKEN_RE.split(s)
+        tokens = parts[1::2]
+        body = ''.join(part.replace('{', '{{').replace('}', '}}') if i % 2 == 0 else
+                       '{_%d}' % (i // 2) for i, part in enumerate(parts))
+        args = ', '.join('_%d' % n for n in range(len(tokens)))
+        ns = {}
+        exec(f"def _t({args}):\n    return f{body!r}\n", ns)
+        fmt = ns['_t']
+        token_vars = [token[1:-1].lower() for token in tokens]
+
+        def tmpl(**kwargs) -> str:
+            values = []
+            for token_var in token_vars:
+                value = kwargs.get(token_var, getattr(self, token_var, None))
+                if value is None:
+                    token = f"<{token_var.upper()}>"
+                    raise RuntimeError(f"Value not found for token {token} (in \"{s}\")")
+                values.append(value)
+            return fmt(*values)
+
+        self._tmpl_cache[s] = tmpl
+        return tmpl
+
     def token_repl(self, s: str, **kwargs) -> str:
         """Replace tokens in ``s`` with values from kwargs or instance variables.
         """
-        tokens = re.findall(r'(\<[\p{Lu}\d_]+\>)', s)
-        for token in tokens:
-            token_var = token[1:-1].lower()
-            value = kwargs.get(token_var, getattr(self, token_var, None))
-            if value is None:
-                raise RuntimeError(f"Value not found for token {token} (in \"{s}\")")
-            s = s.replace(token, str(value))
-        return s
-
-    def fetch_segs(self, category: str, keys: str = None,
-                   dryrun: bool = False) -> Generator[tuple[str, str]]:
-        """Generator for fetching individual segments for specified category and key(s).
-        Yield value is a (key, data) tuple.
+        return self.template(s)(**kwargs)
+
+    def seg_requests(self, category: str, keys: str = None) -> list[tuple[str, str, dict]]:
+        """Return list of (key, url, params) tuples for fetching the segments for specified
+        category and key(s).
         """
         if category not in self.categories:
             raise RuntimeError(f"Category '{category}' not known for '{self.full_name}'")
         cat_cfg = self.categories[category]
         cat_params = cat_cfg.get('addl_params') or {}
 
-        sess = requests.Session()
         keys = keys or self.dflt_keys
         keylist = self.expand_keys(keys)
-
-        for i, key in enumerate(keylist):
+        url_tmpl = self.template(self.fetch_url)
+        fetch_params = self.fetch_params | cat_params
+        param_tmpls = {k: self.template(v) for k, v in fetch_params.items()}
+        # token values that are invariant across keys (note that both category and key are
+        # in TOKEN_VARS, and override values from the category config)
+        base_tokvals = {k: cat_cfg[k] for k in TOKEN_VARS if k in cat_cfg}
+        base_tokvals['category'] = category
+
+        seg_reqs = []
+        for key in keylist:
             if not self.valid_key(key):
                 raise RuntimeError(f"Invalid key '{key}' in \"{keys}\"")
 
-            # note that both category and key are in TOKEN_VARS
-            tokvals = {k: v for k, v in (cat_cfg | locals()).items() if k in TOKEN_VARS}
-            url     = self.token_repl(self.fetch_url, **tokvals)
-            params  = {k: self.token_repl(v, **tokvals)
-                       for k, v in (self.fetch_params | cat_params).items()}
+            tokvals = {**base_tokvals, 'key': key}
+            url     = url_tmpl(**tokvals)
+            params  = {k: tmpl(**tokvals) for k, tmpl in param_tmpls.items()}
+            seg_reqs.append((key, url, params))
+        return seg_reqs
 
-            log.info(f"Fetching from {url} (params: {params})")
-            log.debug(f"HTTP headers: {self.http_headers}")
+    def seg_path(self, category: str, key: str) -> str:
+        """Return full pathname of the fetched segment file for specified category and key
+        (with ".gz" suffix, if ``compress_segs`` is set).
+        """
+        seg_file = "%s:%s.%s" % (category, key, self.fetch_format)
+        if self.compress_segs:
+            seg_file += GZIP_SUFFIX
+        seg_dirs = [REFDATA_DIR, self.name, category]
+        return DataFile(seg_file, seg_dirs)
+
+    def fetch_segs(self, category: str, keys: str = None, dryrun: bool = False,
+                   extra_headers: dict[str, dict] = None
+                   ) -> Generator[tuple[str, 'requests.Response | bytes | None']]:
+        """Generator for fetching individual segments for specified category and key(s).
+        Yield value is a (key, data) tuple, where data is either a streamed response (whose
+        body has not yet been read) or the response content, as bytes.  ``extra_headers``
+        (optional) maps keys to additional request headers (e.g. for conditional requests);
+        data is returned as None for responses of "304 Not Modified".
+
+        If ``fetch_concurrency`` is greater than 1, segments are fetched concurrently (see
+        `_fetch_segs_async`), and yielded (in key order) after all requests complete.  In
+        either case, request start times are spaced by (at least) ``fetch_interval``.
+        """
+        seg_reqs = self.seg_requests(category, keys)
 
-            if dryrun:
+        if dryrun:
+            import requests
+            for key, url, params in seg_reqs:
+                log.info(f"Fetching from {url} (params: {params})")
                 req = requests.Request('GET', url, params=params, headers=self.http_headers)
                 prep = req.prepare()
                 log.info(f"Dryrun: GET '{prep.url}', headers: {prep.headers}")
                 yield key, None
-                continue
+            return
+
+        if self.fetch_concurrency > 1:
+            yield from asyncio.run(self._fetch_segs_async(seg_reqs,
+                                                          extra_headers=extra_headers))
+            return
+
+        sess = self.session
+        for key, url, params in seg_reqs:
+            log.info(f"Fetching from {url} (params: {params})")
+            log.debug(f"HTTP headers: {self.http_headers}")
 
-            if i > 0:
-                sleep(self.fetch_interval)
-            resp = sess.get(url, params=params, headers=self.http_headers)
+            if delay := self._rate_limit_delay():
+                sleep(delay)
+            headers = extra_headers.get(key) if extra_headers else None
+            resp = sess.get(url, params=params, headers=headers, stream=True)
+            if resp.status_code == 304:
+                resp.close()
+                log.info(f"GET '{resp.url}' not modified")
+                yield key, None
+                continue
             if not resp.ok:
+                resp.close()
                 errmsg = f"GET '{resp.url}' returned status code {resp.status_code}"
                 log.error(errmsg)
                 raise RuntimeError(errmsg)
-            yield key, resp.text
+            yield key, resp
+
+    async def _fetch_segs_async(self, seg_reqs: list[tuple], category: str = None,
+                                extra_headers: dict[str, dict] = None
+                                ) -> list[tuple[str, bytes | None]]:
+        """Fetch segments for the specified (key, url, params) tuples concurrently, with at
+        most ``fetch_concurrency`` requests in flight.  Request start times are spaced by
+        ``fetch_interval`` (using the same rate limiting as sequential fetching), so the
+        overall request rate for the host is unchanged (but network latency is overlapped).
+        Return value is a list of (key, data) tuples, in the same order as ``seg_reqs``.
+
+        If ``category`` is specified, each segment is written to its segment file as soon as
+        it is received (in a worker thread, so that disk writes do not hold up the other
+        fetches), in which case data is returned as None.  See `fetch_segs` regarding
+        ``extra_headers`` (data is also returned as None for unmodified segments).
+
+        Note that this requires ``httpx`` (with HTTP/2 support) to be installed.
+        """
+        import httpx
+
+        sem    = asyncio.Semaphore(self.fetch_concurrency)
+        limits = httpx.Limits(max_keepalive_connections=self.fetch_concurrency,
+                              max_connections=self.fetch_concurrency)
+
+        async def fetch_one(client: httpx.AsyncClient, key: str, url: str,
+                            params: dict) -> tuple[str, bytes | None]:
+            async with sem:
+                if delay := self._rate_limit_delay():
+                    await asyncio.sleep(delay)
+                log.info(f"Fetching from {url} (params: {params})")
+                headers = extra_headers.get(key) if extra_headers else None
+                resp = await client.get(url, params=params, headers=headers)
+            if resp.status_code == 304:
+                log.info(f"GET '{resp.url}' not modified")
+                return key, None
+            if resp.is_error:
+                errmsg = f"GET '{resp.url}' returned status code {resp.status_code}"
+                log.error(errmsg)
+                raise RuntimeError(errmsg)
+            if not category:
+                return key, resp.content
+
+            seg_path = self.seg_path(category, key)
+            await asyncio.to_thread(self.save_seg, seg_path, resp.content, resp.headers)
+            return key, None
+
+        log.debug(f"HTTP headers: {self.http_headers}")
+        try:
+            async with (httpx.AsyncClient(http2=True, headers=self.http_headers, limits=limits,
+                                          follow_redirects=True) as client,
+                        asyncio.TaskGroup() as tg):
+                tasks = [tg.create_task(fetch_one(client, *seg_req)) for seg_req in seg_reqs]
+        except ExceptionGroup as eg:
+            # remaining fetches are cancelled on the first error, which we raise directly
+            raise eg.exceptions[0]
+        return [task.result() for task in tasks]
 
     def fetch(self, category: str, keys: str = None, force: bool = False, dryrun: bool = False,
               **kwargs) -> None:
-        """
+        """Fetch and write segment files for specified category and key(s).  Unless
+        ``force`` is specified, segments that were previously fetched are requested
+        conditionally (based on saved ETag and/or Last-Modified values), and are not
+        rewritten if unchanged.
         """
         if kwargs:
             raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
 
-        for key, seg_data in self.fetch_segs(category, keys, dryrun=dryrun):
-            if dryrun:
-                assert seg_data is None
-                continue
-
-            seg_file = "%s:%s.%s" % (category, key, self.fetch_format)
-            seg_dirs = [REFDATA_DIR, self.name, category]
-            seg_path = DataFile(seg_file, seg_dirs)
-            with open(seg_path, 'w') as f:
-                nbytes = f.write(seg_data)
-                log.info(f"{nbytes} bytes written to {seg_path}")
+        extra_headers = None
+        if not force:
+            keylist = self.expand_keys(keys or self.dflt_keys)
+            extra_headers = {key: cond_headers(self.seg_path(category, key)) for key in keylist}
+
+        if self.fetch_concurrency > 1 and not dryrun:
+            # segments are written as they are received
+            seg_reqs = self.seg_requests(category, keys)
+            asyncio.run(self._fetch_segs_async(seg_reqs, category, extra_headers))
+            return
+
+        # segments are written in worker threads, so that the next fetch can proceed while
+        # the previous response is being written (with at most WRITE_WORKERS writes pending)
+        with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+            pending = deque()
+            for key, seg_data in self.fetch_segs(category, keys, dryrun, extra_headers):
+                if seg_data is None:
+                    # dryrun, or not modified
+                    continue
 
-    def get_seg_data(self, fp: TextIO) -> SegData:
+                seg_path = self.seg_path(category, key)
+                pending.append(executor.submit(self.save_seg, seg_path, seg_data,
+                                               seg_data.headers))
+                if len(pending) > WRITE_WORKERS:
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+
+    def save_seg(self, seg_path: str, seg_data: 'requests.Response | bytes',
+                 resp_headers: dict) -> None:
+        """Write fetched segment data (and associated metadata) to the specified file.
         """
+        nbytes = write_seg(seg_path, seg_data)
+        log.info(f"{nbytes} bytes written to {seg_path}")
+        write_seg_meta(seg_path, resp_headers)
+
+    def get_seg_data(self, fp: IO) -> SegData:
+        """Parse segment data from the open file, based on ``data_format``.  Note that
+        "html" is parsed into an lxml element tree (which is much faster than BeautifulSoup).
+        For "html-stream", an iterparse stream of ``tr`` elements is returned (not the whole
+        document), which the loader must consume before the file is closed.  "html-fast"
+        is parsed using selectolax/lexbor (which must be installed), for selector-driven loaders.
         """
         if self.data_format == 'html':
-            return BeautifulSoup(fp, self.html_parser)
+            return lxml.html.parse(fp).getroot()
+        if self.data_format == 'html-stream':
+            return etree.iterparse(fp, events=('end',), tag='tr', html=True)
+        if self.data_format == 'html-fast':
+            from selectolax.lexbor import LexborHTMLParser
+            return LexborHTMLParser(fp.read())
         if self.data_format == 'json':
-            return json.load(fp)
+            # note that JSON is read as bytes (decoded directly by orjson, if available)
+            return json_loads(fp.read())
 
         raise ConfigError(f"Unknown data_format {self.data_format}")
 
-    def read_segs(self, category: str, keys: str = None) -> Generator[tuple[str, SegData]]:
+    def read_segs(self, category: str,
+                  keys: str = None) -> Generator[tuple[os.DirEntry, SegData]]:
         """Generator for reading individual segment data files for specified category and
-        key(s).  Yield value is a (key, data) tuple.
+        key(s).  Yield value is a (dir entry, data) tuple.
+
+        Segment files may be either plain or gzip-compressed (".gz" suffix); if both exist
+        for a segment, the one matching the current ``compress_segs`` setting is used.
         """
         if category not in self.categories:
             raise RuntimeError(f"Category '{category}' not known for '{self.full_name}'")
@@ -222,19 +613,44 @@ class Refdata:
             keys = self.dflt_keys
         keylist = self.expand_keys(keys)
 
+        # list the category directory only once (note that format variants, e.g.
+        # "html-stream", use the base format file suffix)
+        seg_dir = DataFile('', [REFDATA_DIR, self.name, category])
+        seg_ext = '.' + self.data_format.split('-')[0]
+        gz_ext  = seg_ext + GZIP_SUFFIX
+        entries = {}  # keyed by (uncompressed) segment file name
+        with os.scandir(seg_dir) as it:
+            for e in it:
+                if e.name.endswith(seg_ext):
+                    name = e.name
+                elif e.name.endswith(gz_ext):
+                    name = e.name[:-len(GZIP_SUFFIX)]
+                else:
+                    continue
+                if not e.is_file():
+                    continue
+                if name not in entries or (name != e.name) == self.compress_segs:
+                    entries[name] = e
+        binary = self.data_format in BINARY_FORMATS
+
         for key in keylist:
             if not self.valid_key(key):
                 raise RuntimeError(f"Invalid key '{key}' in \"{keys}\"")
             if key is None:
-                key = '*'
+                prefix = f"{category}:"
+                seg_entries = [e for name, e in sorted(entries.items()) if name.startswith(prefix)]
+            else:
+                seg_entry = entries.get(f"{category}:{key}{seg_ext}")
+                seg_entries = [seg_entry] if seg_entry else []
 
-            seg_file = "%s:%s.%s" % (category, key, self.data_format)
-            seg_dirs = [REFDATA_DIR, self.name, category]
-            seg_glob = DataFile(seg_file, seg_dirs)
-            for seg_path in glob(seg_glob):
-                with open(seg_path) as fp:
-                    seg_data = self.get_seg_data(fp)
-                yield seg_path, seg_data
+            for seg_entry in seg_entries:
+                if seg_entry.name.endswith(GZIP_SUFFIX):
+                    fp = gzip.open(seg_entry.path, 'rb' if binary else 'rt')
+                else:
+                    fp = open(seg_entry.path, 'rb' if binary else 'r')
+                # note that we yield with the file still open, for streaming data formats
+                with fp:
+                    yield seg_entry, self.get_seg_data(fp)
 
     def load(self, category: str, keys: str = None, force: bool = False, dryrun: bool = False,
              **kwargs) -> None:
@@ -248,8 +664,10 @@ class Refdata:
             raise ConfigError(f"Category {category} does not have a 'loader' attribute")
         load_func = getattr(self, loader)
 
-        for file, data in self.read_segs(category, keys):
-            file_mtime = os.stat(file).st_mtime
+        for seg_entry, data in self.read_segs(category, keys):
+            file = seg_entry.path
+            # note that stat info is cached in the dir entry
+            file_mtime = seg_entry.stat().st_mtime
             ctx = LoadCtx(file, self.name, date_str(file_mtime), now_str())
             ins, upd, skip = load_func(ctx, data, dryrun)
             log.info(f"Load from {file}: {ins} inserted, {upd} updated, {skip} skipped")
@@ -284,15 +702,338 @@ SUFFIXES         = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X',
 SUFFIXES_CI      = ['jr.', 'sr.', 'the elder', 'the younger', 'el viejo', 'el joven',
                     'le père', 'le fils', 'père', 'fils']
 
+# frozen versions of the above, for lookups (note that ``*_CI`` sets are matched against
+# lowercased strings); the lists are still used where scan order matters
+_TITLES           = frozenset(TITLES)
+_TITLES_CI        = frozenset(TITLES_CI)
+_LAST_PREFIXES    = frozenset(LAST_PREFIXES)
+_LAST_PREFIXES_CI = frozenset(LAST_PREFIXES_CI)
+_SUFFIXES         = frozenset(SUFFIXES)
+_SUFFIXES_CI      = frozenset(SUFFIXES_CI)
+
+# max number of words in multi-word prefixes/suffixes (e.g. "van der", "the Elder")
+_LAST_PREFIX_MAX_WORDS = max(p.count(' ') + 1 for p in _LAST_PREFIXES)
+_SUFFIX_MAX_WORDS      = max(p.count(' ') + 1 for p in _SUFFIXES)
+
+def match_leading(tokens: tuple[str, ...], lo: int, hi: int, vocab: frozenset[str],
+                  max_words: int) -> int:
+    """Return the number of leading elements of ``tokens[lo:hi]`` that (joined by spaces)
+    match an entry in ``vocab``, or 0 if there is no match.  Shorter matches take
+    precedence.
+    """
+    cand = None
+    for i in range(lo, min(lo + max_words, hi)):
+        cand = tokens[i] if cand is None else cand + ' ' + tokens[i]
+        if cand in vocab:
+            return i - lo + 1
+    return 0
+
+def match_trailing(tokens: tuple[str, ...], lo: int, hi: int, vocab: frozenset[str],
+                   max_words: int) -> int:
+    """Return the number of trailing elements of ``tokens[lo:hi]`` that (joined by spaces)
+    match an entry in ``vocab``, or 0 if there is no match.  Shorter matches take
+    precedence.
+    """
+    cand = None
+    for i in range(hi - 1, max(hi - max_words, lo) - 1, -1):
+        cand = tokens[i] if cand is None else tokens[i] + ' ' + cand
+        if cand in vocab:
+            return hi - i
+    return 0
+
+# Rule 1 - match any of the following line endings (will be added to person metainfo as
+# "floruit"):
+#   ", fl. 1971"
+#   ", fl. 1430-1439"
+#   " fl. 1675"
+#   " fl. 1698-1698"
+#
+# Note that we are not enforcing exactly 4 digits per year, to allow for variability
+CLMU_RULE1 = r'(?P<name>.+?)(?P<addl_info>,? fl\. (?P<floruit>[0-9-]+(?:\-[0-9]+)?))'
+
+# Rule 2 - match any of the following line endings (will be added to person metainfo as
+# "dates"):
+#   ", 1971-"
+#   ", 1430-1439"
+#   " 1975-"
+#   " 1698-1698"
+#
+# Same as above regarding date formatting (though this rule only recognizes dates as
+# years)
+CLMU_RULE2 = r'(?P<name>.+?)(?P<addl_info>,? (?P<dates>(?P<born>[0-9-]+)\-(?P<died>[0-9]+)?))'
+
+# both rules combined into a single pattern (rule 1 takes precedence); note that the
+# `regex` module allows group names to be repeated across alternatives
+CLMU_RULES = re.compile(f'{CLMU_RULE1}|{CLMU_RULE2}')
+
+# embedded comma with no following space (e.g. "Last,First")
+COMMA_FIX_RE = re.compile(r'(\pL)\,(\pL)')
+
+# selectors for streamed composer rows (i.e. not navigating from "div.view-content")
+CLMU_NAME_TD = CSSSelector('td.views-field-name')
+CLMU_LINK_A  = CSSSelector('td.views-field-count a')
+
+def person_ids(names: Iterable[str]) -> dict[tuple[str, str], int]:
+    """Return mapping of (name, disamb) to Person ID for the specified names.  Names are
+    queried in batches, to stay within the SQLite parameter limit.
+    """
+    ids = {}
+    for batch in chunked(names, SQLITE_MAX_VARS):
+        query = (Person
+                 .select(Person.id, Person.name, Person.disamb)
+                 .where(Person.name.in_(batch)))
+        ids |= {(p.name, p.disamb): p.id for p in query}
+    return ids
+
+class NameParts(NamedTuple):
+    """Name components parsed from a composer name string (see `parse_name_parts`).
+    """
+    title:       str | None
+    first_name:  str | None
+    middle_name: str | None
+    last_prefix: str | None
+    last_name:   str | None
+    suffix:      str | None
+
+@lru_cache(maxsize=65536)
+def parse_name_parts(comp_name: str) -> NameParts | None:
+    """Parse name components from comp_name, which is assumed to be "by last" (e.g. "Last,
+    First Middle").  Return None if the name cannot be parsed.
+
+    Note that this is a pure function (and results are immutable), so it can be memoized.
+    """
+    title = first_name = middle_name = last_prefix = last_name = suffix = None
+    pieces = comp_name.split(', ')
+
+    # only look for last name prefix if 3 or more pieces, to guard against the case
+    # where last name is a case-insensiive match (e.g. "Van, Jeffrey")
+    if len(pieces) >= 3:
+        if pieces[0] in _LAST_PREFIXES or pieces[0].lower() in _LAST_PREFIXES_CI:
+            assert not last_prefix
+            last_prefix = pieces.pop(0)
+
+    # name suffix can come from the end, or just after the last name
+    if len(pieces) > 1:
+        if pieces[-1] in _SUFFIXES or pieces[-1].lower() in _SUFFIXES_CI:
+            assert not suffix
+            suffix = pieces.pop(-1)
+        elif pieces[1] in _SUFFIXES or pieces[1].lower() in _SUFFIXES_CI:
+            assert not suffix
+            suffix = pieces.pop(1)
+
+    if len(pieces) >= 3:
+        # don't know how to parse from here, so will have to be manually rectified;
+        # any parsing done above is discarded
+        return None
+
+    if len(pieces) == 1:
+        # REVISIT: may want to try parsing single piece on whitespace (e.g. "name
+        # (alias)")!
+        if last_prefix:
+            assert not last_name
+            last_name = pieces.pop(0)
+        else:
+            assert not first_name
+            first_name = pieces.pop(0)
+        return NameParts(title, first_name, middle_name, last_prefix, last_name, suffix)
+
+    assert len(pieces) == 2
+    assert len(pieces[0]) > 0
+    assert len(pieces[1]) > 0
+    # note that the remaining name tokens are represented as index ranges into the split
+    # pieces (`[l_lo:l_hi]` for last, `[f_lo:f_hi]` for first), and only joined into
+    # strings when assigned to name fields
+    last_toks = tuple(pieces[0].split())
+    first_toks = tuple(pieces[1].split())
+    l_lo, l_hi = 0, len(last_toks)
+    f_lo, f_hi = 0, len(first_toks)
+    # REVISIT: are there cases here where we only parse out components when there are
+    # more than one element in either first_toks or last_toks???
+
+    # title (if present) is usually at the leading edge of first_toks, but may also be
+    # represented as the entirety of first_toks (in which case we will do our best shot
+    # at parsing out the first name from last_toks)
+    if f_lo < f_hi:
+        if first_toks[f_lo] in _TITLES:
+            assert not title
+            title = first_toks[f_lo]
+            f_lo += 1
+            if f_lo == f_hi:
+                first_toks, f_lo, f_hi = (last_toks[l_lo],), 0, 1
+                l_lo += 1
+
+    # name suffixes may still be present at the trailing edge of either first_toks or
+    # last_toks (may be multi-word)
+    if f_lo < f_hi:
+        if n := match_trailing(first_toks, f_lo, f_hi, _SUFFIXES, _SUFFIX_MAX_WORDS):
+            assert not suffix
+            suffix = ' '.join(first_toks[f_hi - n:f_hi])
+            f_hi -= n
+
+    if l_lo < l_hi:
+        if n := match_trailing(last_toks, l_lo, l_hi, _SUFFIXES, _SUFFIX_MAX_WORDS):
+            assert not suffix
+            suffix = ' '.join(last_toks[l_hi - n:l_hi])
+            l_hi -= n
+
+    # look for last name prefix in the leading portion of last_toks or the trailing
+    # portion of first_toks
+    if l_lo < l_hi:
+        if n := match_leading(last_toks, l_lo, l_hi, _LAST_PREFIXES, _LAST_PREFIX_MAX_WORDS):
+            assert not last_prefix
+            last_prefix = ' '.join(last_toks[l_lo:l_lo + n])
+            l_lo += n
+
+    if f_lo < f_hi:
+        if n := match_trailing(first_toks, f_lo, f_hi, _LAST_PREFIXES, _LAST_PREFIX_MAX_WORDS):
+            assert not last_prefix
+            last_prefix = ' '.join(first_toks[f_hi - n:f_hi])
+            f_hi -= n
+
+    # there is also the case where a last_prefix/last_name sequence is preceded by a
+    # comma (e.g. "Hildegard, of Bingen"), more like a suffix representation; for
+    # consistency, we will swap the parts and parse as above
+    if f_lo < f_hi:
+        if n := match_leading(first_toks, f_lo, f_hi, _LAST_PREFIXES, _LAST_PREFIX_MAX_WORDS):
+            (last_toks, l_lo, l_hi), (first_toks, f_lo, f_hi) = \
+                (first_toks, f_lo, f_hi), (last_toks, l_lo, l_hi)
+            assert not last_prefix
+            last_prefix = ' '.join(last_toks[l_lo:l_lo + n])
+            l_lo += n
+
+    # entering final phase of processing: set appropriate name fields based on what we
+    # have left--if no name tokens remain, we need to understand how we got here!!!
+    assert l_lo < l_hi or f_lo < f_hi
+
+    # FIRST handle cases of only one name field remaining (either last or first)
+    if l_lo == l_hi:
+        if last_prefix:
+            # treat first_toks as last name
+            assert not last_name
+            last_name = ' '.join(first_toks[f_lo:f_hi])
+        else:
+            assert not first_name
+            first_name = ' '.join(first_toks[f_lo:f_hi])
+        return NameParts(title, first_name, middle_name, last_prefix, last_name, suffix)
+    if f_lo == f_hi:
+        assert not last_name
+        last_name = ' '.join(last_toks[l_lo:l_hi])
+        return NameParts(title, first_name, middle_name, last_prefix, last_name, suffix)
+
+    # NOW handle cases where we have to decide where the various token parts go
+    assert l_lo < l_hi and f_lo < f_hi
+    if f_hi - f_lo > 1:
+        # ATTENTION: disabling the following manipulation for now (clever, but doing
+        # more harm than good)!!!
+        r'''
+        # coelesce leading initials in first_pieces (e.g. "J. S." -> "J.S.")
+        if m := re.fullmatch(r'(\p{Lu}\.( \p{Lu}\.)+)(.*)', ' '.join(first_pieces)):
+            assert not first_name
+            first_name = m.group(1).replace(' ', '')
+            if m.group(3):
+                # leftovers form the middle name
+                assert not middle_name
+                middle_name = m.group(3).strip()
+        else:
+        '''
+        if True:  # TEMP: to keep proper indent level for this block
+            assert not first_name
+            assert not middle_name
+            first_name = first_toks[f_lo]
+            middle_name = ' '.join(first_toks[f_lo + 1:f_hi])
+    else:
+        assert not first_name
+        first_name = first_toks[f_lo]
+
+    assert not last_name
+    last_name = ' '.join(last_toks[l_lo:l_hi])
+    return NameParts(title, first_name, middle_name, last_prefix, last_name, suffix)
+
+def parse_comp_str(comp_str: str, by_last: bool = False) -> tuple:
+    """Return tuple: (comp_name, disamb, alt_comp_str, meta)
+    """
+    comp_name    = None
+    addl_info    = None
+    alt_comp_str = None
+    meta         = {}
+
+    if m := CLMU_RULES.fullmatch(comp_str):
+        comp_name = m['name']
+        addl_info = m['addl_info']
+        if m['floruit']:
+            meta['floruit'] = m['floruit']
+        else:
+            meta['dates'] = m['dates']
+            meta['born'] = m['born']
+            if m['died']:
+                meta['died'] = m['died']
+    else:
+        comp_name = comp_str
+
+    # source-specific processing for creating an alternate version of comp_str if
+    # addl_info is present (basically, swap the first two comma-delimited fields,
+    # omitting the intervening comma)
+    if addl_info:
+        if by_last:
+            pieces = comp_name.split(', ', 2)
+            if len(pieces) == 2:
+                alt_comp_str = f"{pieces[1]} {pieces[0]}{addl_info}"
+            elif len(pieces) > 2:
+                alt_comp_str = f"{pieces[1]} {pieces[0]}, {pieces[2]}{addl_info}"
+            else:
+                assert len(pieces) == 1
+                # also take care of case where one-part name has no comma separator
+                # for addl_info
+                if addl_info[0] == ' ':
+                    alt_comp_str = f"{pieces[0]},{addl_info}"
+        else:
+            # same as just above
+            if comp_name.find(' ') == -1 and addl_info[0] == ' ':
+                alt_comp_str = f"{pieces[0]},{addl_info}"
+
+    # structural fixup for comp_name: fix embedded and trailing commas; try and be
+    # as specific as possible initially (can broaden as needed, based on anomalies)
+    comp_name = COMMA_FIX_RE.sub(r'\1, \2', comp_name)
+    if comp_name[-1] == ',':
+        comp_name = comp_name.rstrip(',')
+
+    disamb = addl_info.lstrip(', ') if addl_info else None
+    return comp_name, disamb, alt_comp_str, meta
+
+def parse_composer_row(row: tuple[str, str | None]) -> tuple:
+    """Parse a (comp_str, link) row from composer segment data.  Return tuple: (comp_str,
+    comp_name, disamb, alt_comp_str, meta, name_parts), where name_parts is None if the
+    name could not be parsed.
+
+    Note that this is a module-level function (with picklable arguments and return value),
+    so that it can be run in worker processes.
+    """
+    comp_str, link = row
+    comp_name, disamb, alt_comp_str, meta = parse_comp_str(comp_str, by_last=True)
+    if link:
+        meta['clmu_link'] = link
+    return comp_str, comp_name, disamb, alt_comp_str, meta, parse_name_parts(comp_name)
+
+def person_from_parts(parts: NameParts, disamb: str | None) -> Person:
+    """Return new (unsaved) Person from parsed name components.
+    """
+    person = Person(**{k: v for k, v in parts._asdict().items() if v is not None})
+    if disamb:
+        person.disamb = disamb
+    return person
+
 class RefdataCLMU(Refdata):
     """
     """
+    __slots__ = ()
+
     def valid_key(self, key: int | str | None) -> bool:
         """A fetch key must be be a valid page number (or ``None``, indicating all pages).
         """
         if key is None:
             return True
-        return isinstance(key, int) or re.fullmatch(r'\d+', key)
+        # note that `isdecimal` (rather than `isdigit`) is equivalent to matching `\d+`
+        return isinstance(key, int) or (isinstance(key, str) and key.isdecimal())
 
     def expand_keys(self, keys: str | int | None) -> Iterable[str | int | None]:
         """
@@ -300,7 +1041,7 @@ class RefdataCLMU(Refdata):
         if keys is None or isinstance(keys, int):
             return [keys]
 
-        m = re.fullmatch(r'(\d+)-(\d+)', keys)
+        m = NUM_RANGE_RE.fullmatch(keys)
         if m and int(m.group(1)) <= int(m.group(2)):
             return range(int(m.group(1)), int(m.group(2)) + 1)
         else:
@@ -309,232 +1050,14 @@ class RefdataCLMU(Refdata):
     def parse_comp_str(self, comp_str: str, by_last: bool = False) -> tuple:
         """Return tuple: (comp_name, disamb, alt_comp_str, meta)
         """
-        comp_name    = None
-        addl_info    = None
-        alt_comp_str = None
-        meta         = {}
-
-        # Rule 1 - match any of the following line endings (will be added to person
-        # metainfo as "floruit"):
-        #   ", fl. 1971"
-        #   ", fl. 1430-1439"
-        #   " fl. 1675"
-        #   " fl. 1698-1698"
-        #
-        # Note that we are not enforcing exactly 4 digits per year, to allow for
-        # variability
-        rule1 = r'(.+?)(,? fl\. ([0-9-]+(\-[0-9]+)?))'
-
-        # Rule 2 - match any of the following line endings (will be added to person
-        # metainfo as "dates"):
-        #   ", 1971-"
-        #   ", 1430-1439"
-        #   " 1975-"
-        #   " 1698-1698"
-        #
-        # Same as above regarding date formatting (though this rule only recognizes dates
-        # as years)
-        rule2 = r'(.+?)(,? (([0-9-]+)\-([0-9]+)?))'
-
-        if m := re.fullmatch(rule1, comp_str):
-            comp_name = m.group(1)
-            addl_info = m.group(2)
-            meta['floruit'] = m.group(3)
-        elif m := re.fullmatch(rule2, comp_str):
-            comp_name = m.group(1)
-            addl_info = m.group(2)
-            meta['dates'] = m.group(3)
-            meta['born'] = m.group(4)
-            if m.group(5):
-                meta['died'] = m.group(5)
-        else:
-            comp_name = comp_str
-
-        # source-specific processing for creating an alternate version of comp_str if
-        # addl_info is present (basically, swap the first two comma-delimited fields,
-        # omitting the intervening comma)
-        if addl_info:
-            if by_last:
-                pieces = comp_name.split(', ', 2)
-                if len(pieces) == 2:
-                    alt_comp_str = f"{pieces[1]} {pieces[0]}{addl_info}"
-                elif len(pieces) > 2:
-                    alt_comp_str = f"{pieces[1]} {pieces[0]}, {pieces[2]}{addl_info}"
-                else:
-                    assert len(pieces) == 1
-                    # also take care of case where one-part name has no comma separator
-                    # for addl_info
-                    if addl_info[0] == ' ':
-                        alt_comp_str = f"{pieces[0]},{addl_info}"
-            else:
-                # same as just above
-                if comp_name.find(' ') == -1 and addl_info[0] == ' ':
-                    alt_comp_str = f"{pieces[0]},{addl_info}"
-
-        # structural fixup for comp_name: fix embedded and trailing commas; try and be
-        # as specific as possible initially (can broaden as needed, based on anomalies)
-        comp_name = re.sub(r'(\pL)\,(\pL)', r'\1, \2', comp_name)
-        if comp_name[-1] == ',':
-            comp_name = comp_name.rstrip(',')
-
-        disamb = addl_info.lstrip(', ') if addl_info else None
-        return comp_name, disamb, alt_comp_str, meta
+        return parse_comp_str(comp_str, by_last)
 
     def parse_comp_name(self, comp_name: str, disamb: str | None) -> Person | None:
         """Note: this assumes that comp_name is "by last" (e.g. "Last, First Middle")
         """
-        person = Person()
-        if disamb:
-            person.disamb = disamb
-        pieces = comp_name.split(', ')
-
-        # only look for last name prefix if 3 or more pieces, to guard against the case
-        # where last name is a case-insensiive match (e.g. "Van, Jeffrey")
-        if len(pieces) >= 3:
-            if pieces[0] in LAST_PREFIXES or pieces[0].lower() in LAST_PREFIXES_CI:
-                assert not person.last_prefix
-                person.last_prefix = pieces.pop(0)
-
-        # name suffix can come from the end, or just after the last name
-        if len(pieces) > 1:
-            if pieces[-1] in SUFFIXES or pieces[-1].lower() in SUFFIXES_CI:
-                assert not person.suffix
-                person.suffix = pieces.pop(-1)
-            elif pieces[1] in SUFFIXES or pieces[1].lower() in SUFFIXES_CI:
-                assert not person.suffix
-                person.suffix = pieces.pop(1)
-
-        if len(pieces) >= 3:
-            # don't know how to parse from here, so will have to be manually rectified;
-            # any parsing done above is discarded
+        if not (parts := parse_name_parts(comp_name)):
             return None
-
-        if len(pieces) == 1:
-            # REVISIT: may want to try parsing single piece on whitespace (e.g. "name
-            # (alias)")!
-            if person.last_prefix:
-                assert not person.last_name
-                person.last_name = pieces.pop(0)
-            else:
-                assert not person.first_name
-                person.first_name = pieces.pop(0)
-            return person
-
-        assert len(pieces) == 2
-        assert len(pieces[0]) > 0
-        assert len(pieces[1]) > 0
-        last_pieces = pieces[0].split()
-        first_pieces = pieces[1].split()
-        # REVISIT: are there cases here where we only parse out components when there are
-        # more than one element in either first_pieces or last_pieces???
-
-        # title (if present) is usually at the leading edge of first_pieces, but may also
-        # be represented as the entirety of first_pieces (in which case we will do our
-        # best shot at parsing out the first name from last_pieces)
-        if first_pieces:
-            if first_pieces[0] in TITLES:
-                assert not person.title
-                person.title = first_pieces.pop(0)
-                if not first_pieces:
-                    first_pieces.append(last_pieces.pop(0))
-
-        # name suffixes may still be present at the trailing edge of either first_pieces
-        # or last_pieces; this is very not pretty, but we hardwire the ability to look for
-        # one and two word strings
-        if first_pieces:
-            if first_pieces[-1] in SUFFIXES:
-                assert not person.suffix
-                person.suffix = first_pieces.pop(-1)
-            elif ' '.join(first_pieces[-2:]) in SUFFIXES:
-                assert not person.suffix
-                person.suffix = first_pieces.pop(-2) + ' ' + first_pieces.pop(-1)
-
-        if last_pieces:
-            if last_pieces[-1] in SUFFIXES:
-                assert not person.suffix
-                person.suffix = last_pieces.pop(-1)
-            elif ' '.join(last_pieces[-2:]) in SUFFIXES:
-                assert not person.suffix
-                person.suffix = last_pieces.pop(-2) + ' ' + last_pieces.pop(-1)
-
-        # look for last name prefix in the leading portion of last_pieces or the trailing
-        # portion of first_pieces
-        if last_pieces:
-            if last_pieces[0] in LAST_PREFIXES:
-                assert not person.last_prefix
-                person.last_prefix = last_pieces.pop(0)
-            elif ' '.join(last_pieces[:2]) in LAST_PREFIXES:
-                assert not person.last_prefix
-                person.last_prefix = last_pieces.pop(0) + ' ' + last_pieces.pop(0)
-
-        if first_pieces:
-            if first_pieces[-1] in LAST_PREFIXES:
-                assert not person.last_prefix
-                person.last_prefix = first_pieces.pop(-1)
-            elif ' '.join(first_pieces[-2:]) in LAST_PREFIXES:
-                assert not person.last_prefix
-                person.last_prefix = first_pieces.pop(-2) + ' ' + first_pieces.pop(-1)
-
-        # there is also the case where a last_prefix/last_name sequence is preceded by a
-        # comma (e.g. "Hildegard, of Bingen"), more like a suffix representation; for
-        # consistency, we will swap the parts and parse as above
-        if first_pieces:
-            if first_pieces[0] in LAST_PREFIXES:
-                last_pieces, first_pieces = first_pieces, last_pieces
-                assert not person.last_prefix
-                person.last_prefix = last_pieces.pop(0)
-            elif ' '.join(first_pieces[:2]) in LAST_PREFIXES:
-                last_pieces, first_pieces = first_pieces, last_pieces
-                assert not person.last_prefix
-                person.last_prefix = last_pieces.pop(0) + ' ' + last_pieces.pop(0)
-
-        # entering final phase of processing: set appropriate name fields based on what we
-        # have left--if no name pieces remain, we need to understand how we got here!!!
-        assert last_pieces or first_pieces
-
-        # FIRST handle cases of only one name field remaining (either last or first)
-        if not last_pieces:
-            if person.last_prefix:
-                # treat first_pieces as last name
-                assert not person.last_name
-                person.last_name = ' '.join(first_pieces)
-            else:
-                assert not person.first_name
-                person.first_name = ' '.join(first_pieces)
-            return person
-        if not first_pieces:
-            assert not person.last_name
-            person.last_name = ' '.join(last_pieces)
-            return person
-
-        # NOW handle cases where we have to decide where the various piece parts go
-        assert last_pieces and first_pieces
-        if len(first_pieces) > 1:
-            # ATTENTION: disabling the following manipulation for now (clever, but doing
-            # more harm than good)!!!
-            r'''
-            # coelesce leading initials in first_pieces (e.g. "J. S." -> "J.S.")
-            if m := re.fullmatch(r'(\p{Lu}\.( \p{Lu}\.)+)(.*)', ' '.join(first_pieces)):
-                assert not person.first_name
-                person.first_name = m.group(1).replace(' ', '')
-                if m.group(3):
-                    # leftovers form the middle name
-                    assert not person.middle_name
-                    person.middle_name = m.group(3).strip()
-            else:
-            '''
-            if True:  # TEMP: to keep proper indent level for this block
-                assert not person.first_name
-                assert not person.middle_name
-                person.first_name = first_pieces.pop(0)
-                person.middle_name = ' '.join(first_pieces)
-        else:
-            assert not person.first_name
-            person.first_name = first_pieces.pop(0)
-
-        assert not person.last_name
-        person.last_name = ' '.join(last_pieces)
-        return person
+        return person_from_parts(parts, disamb)
 
     def parse_comp_full_name(self, comp_name: str, disamb: str | None) -> Person | None:
         """Note: this assumes that comp_name is in "full name" format (e.g. "First Middle
@@ -545,7 +1068,7 @@ class RefdataCLMU(Refdata):
         # see if comp_name looks like a "by last" format (TODO: ...or otherwise not like a
         # well-formed full name!!!)
         if (idx := comp_name.rfind(',')) > -1:
-            if comp_name[idx+1:].strip() not in SUFFIXES:
+            if comp_name[idx+1:].strip() not in _SUFFIXES:
                 return self.parse_comp_name(comp_name, disamb)
             comp_name = comp_name[:idx] + comp_name[idx+1:]
             # FIX: need to investigate this case and figure out how to handle (if
@@ -565,16 +1088,16 @@ class RefdataCLMU(Refdata):
 
         # special-case this, just in case we need to do more process when titles are
         # involved (for now, just move last name to front, as below)
-        if pieces[0] in TITLES:
+        if pieces[0] in _TITLES:
             comp_name = pieces[-1] + ', ' + ' '.join(pieces[:-1])
             return self.parse_comp_name(comp_name, disamb)
 
         # keep trailing suffix in its place, while bring last name to front
-        if len(pieces) > 2 and pieces[-1] in SUFFIXES:
+        if len(pieces) > 2 and pieces[-1] in _SUFFIXES:
             suffix = pieces.pop(-1)
             comp_name = pieces[-1] + ', ' + ' '.join(pieces[:-1]) + ', ' + suffix
             return self.parse_comp_name(comp_name, disamb)
-        elif len(pieces) > 3 and ' '.join(pieces[-2:]) in SUFFIXES:
+        elif len(pieces) > 3 and ' '.join(pieces[-2:]) in _SUFFIXES:
             suffix = pieces.pop(-2) + ' ' + pieces.pop(-1)
             comp_name = pieces[-1] + ', ' + ' '.join(pieces[:-1]) + ', ' + suffix
             return self.parse_comp_name(comp_name, disamb)
@@ -583,11 +1106,12 @@ class RefdataCLMU(Refdata):
         comp_name = pieces[-1] + ', ' + ' '.join(pieces[:-1])
         return self.parse_comp_name(comp_name, disamb)
 
-    def add_composer(self, ctx: LoadCtx, comp_person: Person, meta: dict) -> tuple[bool, list]:
-        """Return tuple: (new comp created? [bool], list of PersonNames)
+    def add_composer(self, ctx: LoadCtx, comp_person: Person, meta: dict) -> tuple[bool, set]:
+        """Return tuple: (new comp created? [bool], set of PersonName strings added or
+        already existing)
         """
         new_comp = False
-        comp_names = []
+        comp_names = set()
         try:
             comp_person.is_composer = True
             comp_person.source      = ctx.source
@@ -619,7 +1143,7 @@ class RefdataCLMU(Refdata):
                                'source_date': ctx.source_date,
                                'created_at':  ctx.load_ts,
                                'updated_at':  ctx.load_ts})
-        PersonMeta.insert_many(meta_items).execute()
+        PersonMeta.bulk_insert(meta_items)
 
         # RETHINK: do we want to add all of these variants proactively, or be more
         # selective here, and provide a richer search at look-up time???
@@ -629,44 +1153,70 @@ class RefdataCLMU(Refdata):
                        'alt_name'      : comp_person.alt_name,
                        'alt_short_name': comp_person.alt_short_name,
                        'alt_var_name'  : comp_person.alt_var_name}
-        for name_type, name_str in other_names.items():
-            if not name_str or name_str in comp_names:
-                continue
-            try:
-                PersonName.create(name_str=name_str,
-                                  name_type=name_type,
-                                  source=ctx.source,
-                                  source_date=ctx.source_date,
-                                  person=comp_person,
-                                  person_res='add_composer',
-                                  created_at=ctx.load_ts,
-                                  updated_at=ctx.load_ts)
-                comp_names.append(name_str)
-            except IntegrityError as e:
-                log.info(f"Duplicate PersonName '{name_str}' ({name_type})")
-                pass
+        # note that duplicate PersonNames are silently ignored (no need to check first)
+        name_rows = self.person_name_rows(ctx, comp_person.id, other_names, 'add_composer',
+                                          comp_names)
+        PersonName.raw_bulk_insert(name_rows)
 
         return new_comp, comp_names
 
+    def composer_rows(self, data: SegData) -> Iterator[tuple[str, str | None]]:
+        """Generator for (comp_str, link) tuples from composer segment data, which may be
+        either a parsed document (lxml, or selectolax for "html-fast") or a stream of ``tr``
+        elements (for "html-stream").
+        """
+        if self.data_format == 'html-fast':
+            for tr in data.css("div.view-content tbody tr"):
+                comp_str = tr.css_first("td.views-field-name").text().strip()
+                link_a = tr.css_first("td.views-field-count a")
+                yield comp_str, link_a.attributes.get('href') if link_a else None
+            return
+
+        if isinstance(data, HtmlElement):
+            content = select_one(data, "div.view-content")
+            for tr in content.cssselect("tbody tr"):
+                comp_str = select_one(tr, "td.views-field-name").text_content().strip()
+                link = select_one(tr, "td.views-field-count a").get('href')
+                yield comp_str, link
+            return
+
+        assert isinstance(data, etree.iterparse)
+        for _, tr in data:
+            # skip header (and any other non-composer) rows
+            if name_tds := CLMU_NAME_TD(tr):
+                comp_str = ''.join(name_tds[0].itertext()).strip()
+                link = CLMU_LINK_A(tr)[0].get('href')
+                yield comp_str, link
+            # release the row and preceding siblings, so that memory use is bounded
+            tr.clear()
+            while tr.getprevious() is not None:
+                del tr.getparent()[0]
+
     def load_composer(self, ctx: LoadCtx, data: SegData,
                       dryrun: bool = False) -> tuple[int, int, int]:
         """Return tuple of record counts: [inserted, updated, skipped].
+
+        Note that all rows are parsed first, then written in a single transaction using
+        batched inserts (with duplicate persons detected up front, rather than by way of
+        `IntegrityError`).  If ``parse_workers`` is greater than 1, rows are parsed in a
+        pool of worker processes.
         """
-        assert isinstance(data, BeautifulSoup)
         ins  = 0
         upd  = 0
         skip = 0
-        soup = data
-        content = soup.select_one("div.view-content")
-        for tr in content.select("tbody tr"):
-            comp_str = tr.select_one("td.views-field-name").string.strip()
-            link = tr.select_one("td.views-field-count").a['href']
-
-            comp_name, disamb, alt_comp_str, meta = self.parse_comp_str(comp_str, by_last=True)
-            if link:
-                meta['clmu_link'] = link
+        ts_cols = {'created_at': ctx.load_ts, 'updated_at': ctx.load_ts}
+
+        comps    = []  # list of tuples: (comp_person, meta, other_names)
+        failures = []
+        if self.parse_workers > 1:
+            rows = list(self.composer_rows(data))
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+                parsed = list(executor.map(parse_composer_row, rows, chunksize=256))
+        else:
+            parsed = map(parse_composer_row, self.composer_rows(data))
 
-            comp_person = self.parse_comp_name(comp_name, disamb)
+        for comp_str, comp_name, disamb, alt_comp_str, meta, parts in parsed:
+            comp_person = person_from_parts(parts, disamb) if parts else None
             if dryrun:
                 full_name = comp_person.full_name if comp_person else '[UNPARSED]'
                 print(f"{comp_name} => {full_name}")
@@ -675,55 +1225,125 @@ class RefdataCLMU(Refdata):
 
             if not comp_person:
                 log.info(f"Could not parse comp_name '{comp_name}'")
-                Failure.create(entity_name=Person.__name__,
-                               entity_str=comp_name,
-                               entity_info={'ctx': ctx},
-                               operation=EntityOp.LOAD,
-                               reason="could not parse",
-                               created_at=ctx.load_ts,
-                               updated_at=ctx.load_ts)
+                failures.append({'entity_name': Person.__name__,
+                                 'entity_str':  comp_name,
+                                 'entity_info': {'ctx': ctx},
+                                 'operation':   EntityOp.LOAD,
+                                 'reason':      "could not parse"} | ts_cols)
                 skip += 1
                 continue
 
-            new_comp, comp_names = self.add_composer(ctx, comp_person, meta)
-            if new_comp:
-                ins += 1
-            else:
-                # REVISIT: there needs to be a process for disambiguating names whenever
-                # duplicates are added to (or detected in) Person!!!
-                comp_person = Person.get(Person.name == comp_person.name,
-                                         Person.disamb == comp_person.disamb)
-                # FIX: should really only consider this an update if new person_names are
-                # actually added, but assume we are doing so (for now)!!!
-                upd += 1
-
+            comp_person.is_composer = True
+            comp_person.source      = ctx.source
+            comp_person.source_date = ctx.source_date
+            comp_person.created_at  = ctx.load_ts
+            comp_person.updated_at  = ctx.load_ts
+            comp_person.set_names()
             other_names = {'comp_str'    : comp_str,
                            'comp_name'   : comp_name,
                            'alt_comp_str': alt_comp_str}
-            for name_type, name_str in other_names.items():
-                if not name_str or name_str in comp_names:
+            comps.append((comp_person, meta, other_names))
+
+        if dryrun:
+            return ins, upd, skip
+
+        # add the source up front (outside of the transaction), so that its ID is cached
+        # for all of the rows below
+        Source.id_for(ctx.source, create=True)
+        with db.atomic():
+            # identify conflicts (with existing persons, or duplicates within this batch)
+            comp_ids  = person_ids({comp_person.name for comp_person, _, _ in comps})
+            new_keys  = set()
+            new_comps = []
+            conflicts = []
+            for comp_person, meta, _ in comps:
+                key = (comp_person.name, comp_person.disamb)
+                if key not in comp_ids and key not in new_keys:
+                    new_keys.add(key)
+                    new_comps.append(comp_person)
                     continue
-                try:
-                    PersonName.create(name_str=name_str,
-                                      name_type=name_type,
-                                      source=ctx.source,
-                                      source_date=ctx.source_date,
-                                      person=comp_person,
-                                      person_res='load_composer',
-                                      created_at=ctx.load_ts,
-                                      updated_at=ctx.load_ts)
-                except IntegrityError as e:
-                    log.info(f"Duplicate PersonName '{name_str}' ({name_type})")
-                    pass
+                person_data = dict(comp_person.__data__)
+                person_data['ctx'] = ctx
+                person_data['meta'] = meta
+                log.info(f"Conflict saving Person: {person_data}")
+                conflicts.append({'entity_name': Person.__name__,
+                                  'entity_str':  comp_person.name,
+                                  'entity_info': person_data,
+                                  'operation':   EntityOp.INSERT,
+                                  'reason':      "duplicate"} | ts_cols)
+                # REVISIT: there needs to be a process for disambiguating names whenever
+                # duplicates are added to (or detected in) Person!!!  Also, should really
+                # only consider this an update if new person_names are actually added, but
+                # assume we are doing so (for now)!!!
+                upd += 1
+
+            Person.bulk_insert((p.__data__ for p in new_comps), ignore_conflicts=True)
+            ins += len(new_comps)
+            comp_ids |= person_ids({key[0] for key in new_keys})
+
+            # RETHINK: do we want to add all of these variants proactively, or be more
+            # selective here, and provide a richer search at look-up time???
+            meta_rows = []
+            name_rows = []
+            for comp_person, meta, other_names in comps:
+                key = (comp_person.name, comp_person.disamb)
+                person_id = comp_ids[key]
+                seen = set()
+                if key in new_keys:
+                    new_keys.remove(key)  # only the first occurrence is new
+                    for k, v in meta.items():
+                        meta_rows.append({'person':      person_id,
+                                          'key':         k,
+                                          'value':       v,
+                                          'source':      ctx.source,
+                                          'source_date': ctx.source_date} | ts_cols)
+                    var_names = {'name'          : comp_person.name,
+                                 'short_name'    : comp_person.short_name,
+                                 'var_name'      : comp_person.var_name,
+                                 'alt_name'      : comp_person.alt_name,
+                                 'alt_short_name': comp_person.alt_short_name,
+                                 'alt_var_name'  : comp_person.alt_var_name}
+                    name_rows += self.person_name_rows(ctx, person_id, var_names,
+                                                       'add_composer', seen)
+                name_rows += self.person_name_rows(ctx, person_id, other_names,
+                                                   'load_composer', seen)
+
+            # note that duplicate PersonNames are silently ignored
+            PersonName.raw_bulk_insert(name_rows)
+            for model, rows in ((PersonMeta, meta_rows),
+                                (Conflict, conflicts),
+                                (Failure, failures)):
+                model.bulk_insert(rows, ignore_conflicts=True)
 
         return ins, upd, skip
 
+    def person_name_rows(self, ctx: LoadCtx, person_id: int, names: dict[str, str],
+                         person_res: str, seen: set) -> list[dict]:
+        """Return PersonName rows (for bulk insert) for the specified ``names`` (mapping of
+        name_type to name_str), skipping null and already ``seen`` values.
+        """
+        rows = []
+        for name_type, name_str in names.items():
+            if not name_str or name_str in seen:
+                continue
+            seen.add(name_str)
+            rows.append({'name_str':      name_str,
+                         'name_str_norm': norm_cached(name_str),
+                         'name_type':     name_type,
+                         'source':        ctx.source,
+                         'source_date':   ctx.source_date,
+                         'person':        person_id,
+                         'person_res':    person_res,
+                         'created_at':    ctx.load_ts,
+                         'updated_at':    ctx.load_ts})
+        return rows
+
     def find_composer(self, ctx: LoadCtx, comp_name: str,
                       id_only: bool = False) -> Person | int | None:
         """
         """
         query = (PersonName
-                 .select()
+                 .select(PersonName, Person)
                  .join(Person)
                  .where(PersonName.name_str == comp_name,
                         PersonName.source == ctx.source))
@@ -731,9 +1351,9 @@ class RefdataCLMU(Refdata):
         if not pnames:
             # try normalized name match (combine with above?)
             query = (PersonName
-                     .select()
+                     .select(PersonName, Person)
                      .join(Person)
-                     .where(PersonName.name_str_norm == norm(comp_name),
+                     .where(PersonName.name_str_norm == norm_cached(comp_name),
                             PersonName.source == ctx.source))
             pnames = list(query.execute())
             if not pnames:
@@ -750,137 +1370,128 @@ class RefdataCLMU(Refdata):
     def load_work(self, ctx: LoadCtx, data: SegData, dryrun: bool = False) -> tuple[int, int, int]:
         """Return tuple of record counts: [inserted, updated, skipped].
         """
-        assert isinstance(data, BeautifulSoup)
+        assert isinstance(data, HtmlElement)
         ins  = 0
         upd  = 0
         skip = 0
-        soup = data
-        content = soup.select_one("div.view-content")
-        for i, item_div in enumerate(content.select("div.lazr-browse-composition-item")):
-            title_div   = item_div.select_one("div.lazr-browse-composition-title")
-            compsr_div  = item_div.select_one("div.lazr-browse-composition-composer")
-            perfs_ul    = item_div.select_one("ul.lazr-browse-composition-performances")
-            title_span  = perfs_ul.li.find('span', attrs={'data-field': "real_title"})
-
-            item_title  = item_div['title']
-            genre       = item_div['genre']
-            composed    = item_div['composed']
-            title       = title_div.span.string.strip()
-            if title != item_title:
-                log.info(f"load_work: '{title}' != '{item_title}' ({ctx.file}:{i})")
-            if not compsr_div:
-                log.info(f"load_work: '{item_title}' no composer div, skipping ({ctx.file}:{i})")
-                Failure.create(entity_name=Work.__name__,
-                               entity_str=title,
-                               entity_info={'ctx': ctx},
-                               operation=EntityOp.LOAD,
-                               reason="no composer div",
-                               created_at=ctx.load_ts,
-                               updated_at=ctx.load_ts)
-                continue
-            comp_str   = compsr_div.span.string.strip()
-            real_title = title_span.string.strip()
+        # note that failures and conflicts are not needed for processing subsequent items,
+        # so are inserted in bulk at the end (including if an exception is raised)
+        failures  = []
+        conflicts = []
+        ts_cols   = {'created_at': ctx.load_ts, 'updated_at': ctx.load_ts}
+        try:
+            content = select_one(data, "div.view-content")
+            for i, item_div in enumerate(content.cssselect("div.lazr-browse-composition-item")):
+                title_div   = select_one(item_div, "div.lazr-browse-composition-title")
+                compsr_div  = select_one(item_div, "div.lazr-browse-composition-composer")
+                perfs_li    = select_one(item_div, "ul.lazr-browse-composition-performances li")
+                title_span  = select_one(perfs_li, 'span[data-field="real_title"]')
+
+                item_title  = item_div.get('title')
+                genre       = item_div.get('genre')
+                composed    = item_div.get('composed')
+                title       = select_one(title_div, "span").text_content().strip()
+                if title != item_title:
+                    log.info(f"load_work: '{title}' != '{item_title}' ({ctx.file}:{i})")
+                if compsr_div is None:
+                    log.info(f"load_work: '{item_title}' no composer div, skipping "
+                             f"({ctx.file}:{i})")
+                    failures.append({'entity_name': Work.__name__,
+                                     'entity_str':  title,
+                                     'entity_info': {'ctx': ctx},
+                                     'operation':   EntityOp.LOAD,
+                                     'reason':      "no composer div"} | ts_cols)
+                    continue
+                comp_str   = select_one(compsr_div, "span").text_content().strip()
+                real_title = title_span.text_content().strip()
 
-            meta = {}
-            meta['short_title'] = title
+                meta = {}
+                meta['short_title'] = title
 
-            # look for a quick match without having to parse
-            comp_person = self.find_composer(ctx, comp_str)
-            if not comp_person:
-                comp_name, disamb, alt_comp_str, meta = self.parse_comp_str(comp_str)
-                comp_person = self.parse_comp_full_name(comp_name, disamb)
+                # look for a quick match without having to parse
+                comp_person = self.find_composer(ctx, comp_str)
+                if not comp_person:
+                    comp_name, disamb, alt_comp_str, meta = self.parse_comp_str(comp_str)
+                    comp_person = self.parse_comp_full_name(comp_name, disamb)
+                    if dryrun:
+                        full_name = comp_person.full_name if comp_person else '[UNPARSED]'
+                        print(f"{full_name} (new): {real_title}")
+                        continue
+
+                    if not comp_person:
+                        log.info(f"Could not parse comp_name '{comp_name}'")
+                        failures.append({'entity_name': Person.__name__,
+                                         'entity_str':  comp_name,
+                                         'entity_info': {'ctx': ctx},
+                                         'operation':   EntityOp.LOAD,
+                                         'reason':      "could not parse"} | ts_cols)
+                        log.info(f"Could not load work '{real_title}'")
+                        failures.append({'entity_name': Work.__name__,
+                                         'entity_str':  real_title,
+                                         'entity_info': {'ctx': ctx},
+                                         'operation':   EntityOp.LOAD,
+                                         'reason':      "no composer rec"} | ts_cols)
+
+                        skip += 1
+                        continue
+
+                    new_comp, comp_names = self.add_composer(ctx, comp_person, meta)
+                    if not new_comp:
+                        # REVISIT: there needs to be a process for disambiguating names
+                        # whenever duplicates are added to (or detected in) Person!!!
+                        comp_person = Person.get(Person.name == comp_person.name,
+                                                 Person.disamb == comp_person.disamb)
+
+                    other_names = {'comp_str'    : comp_str,
+                                   'comp_name'   : comp_name,
+                                   'alt_comp_str': alt_comp_str}
+                    name_rows = self.person_name_rows(ctx, comp_person.id, other_names,
+                                                      'load_work', set(comp_names))
+                    PersonName.raw_bulk_insert(name_rows)
+
+                #work = self.parse_work_name(real_title)
                 if dryrun:
-                    full_name = comp_person.full_name if comp_person else '[UNPARSED]'
-                    print(f"{full_name} (new): {real_title}")
+                    print(f"{comp_person.name}: {real_title}")
+                    #print(f"{real_title} => {work.name}")
+                    #print(comp_name, meta)
                     continue
 
-                if not comp_person:
-                    log.info(f"Could not parse comp_name '{comp_name}'")
-                    Failure.create(entity_name=Person.__name__,
-                                   entity_str=comp_name,
-                                   entity_info={'ctx': ctx},
-                                   operation=EntityOp.LOAD,
-                                   reason="could not parse",
-                                   created_at=ctx.load_ts,
-                                   updated_at=ctx.load_ts)
-                    log.info(f"Could not load work '{real_title}'")
-                    Failure.create(entity_name=Work.__name__,
-                                   entity_str=real_title,
-                                   entity_info={'ctx': ctx},
-                                   operation=EntityOp.LOAD,
-                                   reason="no composer rec",
-                                   created_at=ctx.load_ts,
-                                   updated_at=ctx.load_ts)
-
+                work = Work()
+                work.composer = comp_person
+                if not work:
                     skip += 1
                     continue
-
-                new_comp, comp_names = self.add_composer(ctx, comp_person, meta)
-                if not new_comp:
-                    # REVISIT: there needs to be a process for disambiguating names
-                    # whenever duplicates are added to (or detected in) Person!!!
-                    comp_person = Person.get(Person.name == comp_person.name,
-                                             Person.disamb == comp_person.disamb)
-
-                other_names = {'comp_str'    : comp_str,
-                               'comp_name'   : comp_name,
-                               'alt_comp_str': alt_comp_str}
-                for name_type, name_str in other_names.items():
-                    if not name_str or name_str in comp_names:
-                        continue
-                    try:
-                        PersonName.create(name_str=name_str,
-                                          name_type=name_type,
-                                          source=ctx.source,
-                                          source_date=ctx.source_date,
-                                          person=comp_person,
-                                          person_res='load_work',
-                                          created_at=ctx.load_ts,
-                                          updated_at=ctx.load_ts)
-                    except IntegrityError as e:
-                        log.info(f"Duplicate PersonName '{name_str}' ({name_type})")
-                        pass
-
-            #work = self.parse_work_name(real_title)
-            if dryrun:
-                print(f"{comp_person.name}: {real_title}")
-                #print(f"{real_title} => {work.name}")
-                #print(comp_name, meta)
-                continue
-
-            work = Work()
-            work.composer = comp_person
-            if not work:
-                skip += 1
-                continue
-            try:
-                work.work_type   = genre
-                work.work_title  = real_title
-                work.work_date   = composed
-                work.source      = ctx.source
-                work.source_date = ctx.source_date
-                work.save()
-                ins += 1
-            except IntegrityError as e:
-                work_data = dict(work.__data__)
-                work_data['ctx'] = ctx
-                work_data['meta'] = meta
-                log.info(f"Conflict saving Work: {work_data}")
-                Conflict.create(entity_name=Work.__name__,
-                                entity_str=real_title,
-                                entity_info=work_data,
-                                operation=EntityOp.LOAD,
-                                reason="duplicate",
-                                created_at=ctx.load_ts,
-                                updated_at=ctx.load_ts)
-
-                work = Work.get(Work.composer == work.composer,
-                                Work.name == work.name,
-                                Work.disamb == work.disamb)
-                # FIX: not really updating, but separate this case from unparseable!!!
-                # note that we fall through here so that we can (possibly) add new
-                # work_names
-                upd += 1
+                try:
+                    work.work_type   = genre
+                    work.work_title  = real_title
+                    work.work_date   = composed
+                    work.source      = ctx.source
+                    work.source_date = ctx.source_date
+                    work.save()
+                    ins += 1
+                except IntegrityError as e:
+                    work_data = dict(work.__data__)
+                    work_data['ctx'] = ctx
+                    work_data['meta'] = meta
+                    log.info(f"Conflict saving Work: {work_data}")
+                    conflicts.append({'entity_name': Work.__name__,
+                                      'entity_str':  real_title,
+                                      'entity_info': work_data,
+                                      'operation':   EntityOp.LOAD,
+                                      'reason':      "duplicate"} | ts_cols)
+
+                    work = Work.get(Work.composer == work.composer,
+                                    Work.name == work.name,
+                                    Work.disamb == work.disamb)
+                    # FIX: not really updating, but separate this case from unparseable!!!
+                    # note that we fall through here so that we can (possibly) add new
+                    # work_names
+                    upd += 1
+        finally:
+            # make sure diagnostics collected so far are recorded, even if processing is
+            # aborted partway through
+            for model, rows in ((Conflict, conflicts), (Failure, failures)):
+                model.bulk_insert(rows)
 
         return ins, upd, skip
 
@@ -891,6 +1502,8 @@ class RefdataCLMU(Refdata):
 class RefdataIMSLP(Refdata):
     """
     """
+    __slots__ = ()
+
     def fetch(self, category: str, keys: str = None, force: bool = False, dryrun: bool = False,
               **kwargs) -> None:
         """
@@ -904,7 +1517,7 @@ class RefdataIMSLP(Refdata):
 class RefdataPresto(Refdata):
     """
     """
-    pass
+    __slots__ = ()
 
 ################
 # RefdataArkiv #
@@ -913,6 +1526,8 @@ class RefdataPresto(Refdata):
 class RefdataArkiv(Refdata):
     """
     """
+    __slots__ = ()
+
     def fetch(self, category: str, keys: str = None, force: bool = False, dryrun: bool = False,
               **kwargs) -> None:
         """
@@ -926,6 +1541,8 @@ class RefdataArkiv(Refdata):
 class RefdataOpenOpus(Refdata):
     """
     """
+    __slots__ = ()
+
     def fetch(self, category: str, keys: str = None, force: bool = False, dryrun: bool = False,
               **kwargs) -> None:
         """
@@ -938,8 +1555,6 @@ class RefdataOpenOpus(Refdata):
 
 import sys
 
-from ckautils import parse_argv
-
 ACTIONS = ['fetch', 'load']
 
 def main() -> int:
@@ -984,17 +1599,18 @@ def main() -> int:
         print(f"Category '{category}' not known", file=sys.stderr)
         return -1
 
+    from ckautils import parse_argv
     args, kwargs = parse_argv(sys.argv[4:])
     if args:
         print(f"Unexpected argument(s): {', '.join(args)}", file=sys.stderr)
         return -1
 
-    refdata = Refdata.new(source)
-    refdata_func = getattr(refdata, action)
+    with Refdata.new(source) as refdata:
+        refdata_func = getattr(refdata, action)
 
-    # note that kwargs are validated by the action; return value is ignored (exceptions
-    # should be raised for errors)
-    refdata_func(category, **kwargs)
+        # note that kwargs are validated by the action; return value is ignored (exceptions
+        # should be raised for errors)
+        refdata_func(category, **kwargs)
     return 0
 
 if __name__ == '__main__':
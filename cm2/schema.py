@@ -4,14 +4,18 @@
 """Schema entity definitions and management commands.
 """
 
-from enum import StrEnum
+from enum import StrEnum, IntFlag
+from collections.abc import Iterable
 
-from peewee import *
-from playhouse.sqlite_ext import *
+from peewee import (TextField, IntegerField, BooleanField, DateField, ForeignKeyField,
+                    CompositeKey, SQL, JOIN, ModelSelect, Expression, FieldAccessor,
+                    prefetch, chunked)
+from playhouse.sqlite_ext import JSONField, FTS5Model, SearchField
 
 from .core import log
-from .langutils import norm
-from .dbcore import db, BaseModel
+from .langutils import norm_cached
+from .dbcore import (db, BaseModel, MsgPackField, json_dumps, json_loads, now_str,
+                     SQLITE_MAX_VARS)
 
 #########
 # Enums #
@@ -24,19 +28,207 @@ class EntityOp(StrEnum):
     LOAD   = "load"
     INSERT = "insert"
 
+# bit values for `Person.flags`
+class PersonFlag(IntFlag):
+    COMPOSER  = 1
+    CONDUCTOR = 2
+    PERFORMER = 4
+    CANONICAL = 8
+
+# boolean `Person` properties for the flags (same as the legacy column names)
+PERSON_FLAG_ATTRS = {'is_composer':  PersonFlag.COMPOSER,
+                     'is_conductor': PersonFlag.CONDUCTOR,
+                     'is_performer': PersonFlag.PERFORMER,
+                     'is_canonical': PersonFlag.CANONICAL}
+
+##########
+# Source #
+##########
+
+class Source(BaseModel):
+    """Lookup table for reference data source names (referenced by `SourceField`)
+    """
+    name          = TextField(unique=True)
+
+    # caches of source name to ID, and vice versa (note, reset by `create()`); names added
+    # within a transaction are held back (as pending) until seen outside of a transaction,
+    # since the insert may yet be rolled back
+    _ids: dict[str, int] = {}
+    _names: dict[int, str] = {}
+    _pending: set[str] = set()
+
+    @classmethod
+    def cache(cls, name: str, source_id: int) -> None:
+        """Add name/ID mapping to the caches, unless added by a transaction in progress.
+        """
+        if name in cls._pending:
+            if db.in_transaction():
+                return
+            cls._pending.discard(name)
+        cls._ids[name] = source_id
+        cls._names[source_id] = name
+
+    @classmethod
+    def id_for(cls, name: str, create: bool = False) -> int | None:
+        """Return ID for the specified source name, or None if not found.  If ``create``
+        is specified, the source is added to the table, if needed.
+        """
+        if (source_id := cls._ids.get(name)) is not None:
+            return source_id
+        source_id = cls.select(cls.id).where(cls.name == name).scalar()
+        if source_id is None:
+            if not create:
+                return None
+            source_id = cls.insert(cls.prep_bulk_row({'name': name})).execute()
+            if db.in_transaction():
+                cls._pending.add(name)
+        cls.cache(name, source_id)
+        return source_id
+
+    @classmethod
+    def name_for(cls, source_id: int) -> str | None:
+        """Return source name for the specified ID, or None if not found.
+        """
+        if (name := cls._names.get(source_id)) is not None:
+            return name
+        name = cls.select(cls.name).where(cls.id == source_id).scalar()
+        if name is not None:
+            cls.cache(name, source_id)
+        return name
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Clear cached name/ID mappings (e.g. if the table is recreated).
+        """
+        cls._ids.clear()
+        cls._names.clear()
+        cls._pending.clear()
+
+class SourceAccessor(FieldAccessor):
+    """Accessor for `SourceField`, which returns the source name (rather than a `Source`
+    instance or ID)
+    """
+    def __get__(self, instance, instance_type=None):
+        if instance is None:
+            return self.field
+        value = instance.__data__.get(self.name)
+        return Source.name_for(value) if isinstance(value, int) else value
+
+class SourceField(ForeignKeyField):
+    """Reference to `Source`, which is read and assigned (or compared against) using the
+    source name, e.g. ``PersonName.source == ctx.source``.  Note that names are only
+    added to `Source` when written (see `SourcedModel`), so comparing against an unknown
+    name just matches nothing.
+    """
+    accessor_class = SourceAccessor
+
+    def __init__(self, **kwargs):
+        super().__init__(Source, **kwargs)
+
+    def db_value(self, value):
+        if isinstance(value, str):
+            value = Source.id_for(value)
+        return super().db_value(value)
+
+class SourcedModel(BaseModel):
+    """Base class for models with a `source` field (see `SourceField`), which adds new
+    source names to `Source` on write
+    """
+    def save(self, *args, **kwargs):
+        if isinstance(source := self.__data__.get('source'), str):
+            Source.id_for(source, create=True)
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def prep_bulk_row(cls, row: dict) -> dict:
+        row = super().prep_bulk_row(row)
+        if isinstance(source := row.get('source'), str):
+            row['source'] = Source.id_for(source, create=True)
+        return row
+
+    @classmethod
+    def resolve_sources(cls, rows: Iterable[dict]) -> list[dict]:
+        """Return rows (field values) with source names replaced by `Source` IDs, which are
+        looked up (or added) once per distinct name, rather than for each row.
+        """
+        rows = list(rows)
+        ids = {}
+        for row in rows:
+            if isinstance(source := row.get('source'), str) and source not in ids:
+                ids[source] = Source.id_for(source, create=True)
+        if not ids:
+            return rows
+        return [row | {'source': ids[row['source']]} if row.get('source') in ids else row
+                for row in rows]
+
+    @classmethod
+    def bulk_insert(cls, rows: Iterable[dict], batch_size: int = None,
+                    ignore_conflicts: bool = False) -> int:
+        return super().bulk_insert(cls.resolve_sources(rows), batch_size, ignore_conflicts)
+
 ##########
 # Person #
 ##########
 
 # Note: "comp" in this module means component (not composer)
-NAME_COMPS         = ['title', 'first_name', 'middle_name', 'last_prefix', 'last_name', 'suffix']
-SH_NAME_COMPS      = ['title', 'first_name', 'last_prefix', 'last_name', 'suffix']
-VAR_NAME_COMPS     = ['title', 'middle_name', 'last_prefix', 'last_name', 'suffix']
-ALT_NAME_COMPS     = ['last_name', 'suffix', 'title', 'first_name', 'middle_name', 'last_prefix']
-ALT_SH_NAME_COMPS  = ['last_name', 'suffix', 'title', 'first_name', 'last_prefix']
-ALT_VAR_NAME_COMPS = ['last_name', 'suffix', 'title', 'middle_name', 'last_prefix']
-
-class Person(BaseModel):
+NAME_COMPS         = ('title', 'first_name', 'middle_name', 'last_prefix', 'last_name', 'suffix')
+SH_NAME_COMPS      = ('title', 'first_name', 'last_prefix', 'last_name', 'suffix')
+VAR_NAME_COMPS     = ('title', 'middle_name', 'last_prefix', 'last_name', 'suffix')
+ALT_NAME_COMPS     = ('last_name', 'suffix', 'title', 'first_name', 'middle_name', 'last_prefix')
+ALT_SH_NAME_COMPS  = ('last_name', 'suffix', 'title', 'first_name', 'last_prefix')
+ALT_VAR_NAME_COMPS = ('last_name', 'suffix', 'title', 'middle_name', 'last_prefix')
+NAME_COMPS_SET     = frozenset(NAME_COMPS)
+
+# name constructions, in the order returned by `build_names()` (and `Person.all_names`);
+# short and variant forms are only built if first_name and middle_name (respectively)
+# are present
+NAME_VARIANTS      = (NAME_COMPS, SH_NAME_COMPS, VAR_NAME_COMPS,
+                      ALT_NAME_COMPS, ALT_SH_NAME_COMPS, ALT_VAR_NAME_COMPS)
+ALT_VARIANT_START  = 3
+VARIANT_IDXS       = tuple(tuple(NAME_COMPS.index(c) for c in v) for v in NAME_VARIANTS)
+VARIANT_REQD       = (None, NAME_COMPS.index('first_name'), NAME_COMPS.index('middle_name')) * 2
+
+def flag_property(flag: PersonFlag) -> property:
+    """Return boolean property for reading/writing the specified bit in `flags`.
+    """
+    def getter(self) -> bool:
+        return bool((self.flags or 0) & flag)
+
+    def setter(self, value: bool) -> None:
+        if value:
+            self.flags = (self.flags or 0) | flag
+        else:
+            self.flags = (self.flags or 0) & ~flag
+
+    return property(getter, setter)
+
+def build_names(comps: tuple[str | None, ...]) -> tuple[str | None, ...]:
+    """Return all name constructions (see `NAME_VARIANTS`) for the specified tuple of name
+    component values (in `NAME_COMPS` order).
+    """
+    sf = comps[-1]
+    ln = comps[-2]
+    names = []
+    for n, idxs in enumerate(VARIANT_IDXS):
+        reqd = VARIANT_REQD[n]
+        if reqd is not None and not comps[reqd]:
+            names.append(None)
+            continue
+        parts = [comps[i] for i in idxs if comps[i]]
+        if n < ALT_VARIANT_START:
+            # add comma before name suffix, if exists
+            if sf and len(parts) > 1:
+                parts[-2] += ','
+        elif ln and len(parts) > 1:
+            # add comma after last name, or suffix (if exists)
+            if not sf:
+                parts[0] += ','
+            elif len(parts) > 2:
+                parts[1] += ','
+        names.append(' '.join(parts))
+    return tuple(names)
+
+class Person(SourcedModel):
     """Represents a person
     """
     name          = TextField()           # defaults to full_name
@@ -51,23 +243,26 @@ class Person(BaseModel):
     last_name     = TextField(null=True)
     suffix        = TextField(null=True)
 
-    # denormalized flags (from `tags` and joins)
-    is_composer   = BooleanField(null=True)
-    is_conductor  = BooleanField(null=True)
-    is_performer  = BooleanField(null=True)
+    # denormalized flags (from `tags` and joins), as bitmask of `PersonFlag` values (use
+    # the `is_*` properties to access, and `has_flag()` in queries)
+    flags         = IntegerField(default=0, constraints=[SQL('DEFAULT 0')])
+    is_composer   = flag_property(PersonFlag.COMPOSER)
+    is_conductor  = flag_property(PersonFlag.CONDUCTOR)
+    is_performer  = flag_property(PersonFlag.PERFORMER)
 
     # NOTE: canonical record is assumed to be normalized and authoritative
-    is_canonical  = BooleanField(null=True)
-    cnl_person_id = ForeignKeyField('self', null=True, backref='aliases')  # points to self, if canonical
+    is_canonical  = flag_property(PersonFlag.CANONICAL)
+    cnl_person_id = ForeignKeyField('self', null=True, backref='aliases',  # points to self, if canonical
+                                    lazy_load=False)
 
     # reference info
-    tags          = JSONField(default=[])  # JSON array of strings
-    notes         = JSONField(default=[])  # JSON array of strings
+    tags          = MsgPackField(default=list)  # array of strings (see also PersonTag)
+    notes         = MsgPackField(default=list)  # array of strings
     born          = TextField(null=True)
     died          = TextField(null=True)
     country       = TextField(null=True)
     epoch         = TextField(null=True)
-    source        = TextField(null=True)
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
     arkiv_uri     = TextField(null=True)
 
@@ -76,108 +271,234 @@ class Person(BaseModel):
             # duplicate names must be disambiguatable
             (('name', 'disamb'), True),
             (('alt_name',), False),
+            # covering index for name lookups returning display columns
+            (('name', 'disamb', 'alt_name', 'flags'), False),
         )
 
+    # partial indexes for the (much smaller) subsets of persons typically looked up (note
+    # that queries must use `has_flag()` for these to be used)
+    EXTRA_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS person_canonical_name "
+        f"ON person (name) WHERE flags & {PersonFlag.CANONICAL:d}",
+        "CREATE INDEX IF NOT EXISTS person_composer_name "
+        f"ON person (name) WHERE flags & {PersonFlag.COMPOSER:d}",
+        "CREATE INDEX IF NOT EXISTS person_conductor_name "
+        f"ON person (name) WHERE flags & {PersonFlag.CONDUCTOR:d}",
+        "CREATE INDEX IF NOT EXISTS person_performer_name "
+        f"ON person (name) WHERE flags & {PersonFlag.PERFORMER:d}"
+    ]
+
+    @classmethod
+    def has_flag(cls, flag: PersonFlag) -> Expression:
+        """Return query expression for persons with the specified flag set.
+        """
+        return cls.flags.bin_and(flag)
+
+    @classmethod
+    def with_tag(cls, tag: str) -> ModelSelect:
+        """Return query for persons with the specified tag (using the `PersonTag` index).
+        """
+        return cls.select().join(PersonTag).where(PersonTag.tag == tag)
+
+    @property
+    def name_comps(self) -> tuple[str | None, ...]:
+        """ Tuple of name component values (in `NAME_COMPS` order).
+        """
+        return (self.title, self.first_name, self.middle_name, self.last_prefix,
+                self.last_name, self.suffix)
+
+    @property
+    def all_names(self) -> tuple[str | None, ...]:
+        """ Tuple of all name constructions (in `NAME_VARIANTS` order), cached on the
+        instance for the current name component values.
+        """
+        comps = self.name_comps
+        cached = self.__dict__.get('_name_cache')
+        if cached and cached[0] == comps:
+            return cached[1]
+        names = build_names(comps)
+        self._name_cache = (comps, names)
+        return names
+
     @property
     def full_name(self) -> str:
         """ Construct full name from individual name components.
         """
-        comps = [getattr(self, x) for x in NAME_COMPS if getattr(self, x)]
-        # add comma before name suffix, if exists
-        if self.suffix:
-            assert len(comps) > 1
-            comps[-2] += ','
-        return ' '.join(comps)
+        return self.all_names[0]
 
     @property
     def short_name(self) -> str:
         """ Short(er) construction of person's name, omitting middle_name.
         """
-        if not self.first_name:
-            return None
-        comps = [getattr(self, x) for x in SH_NAME_COMPS if getattr(self, x)]
-        # add comma before name suffix, if exists
-        if self.suffix:
-            assert len(comps) > 1
-            comps[-2] += ','
-        return ' '.join(comps)
+        return self.all_names[1]
 
     @property
     def var_name(self) -> str:
         """ Variant short(er) construction of person's name, omitting first_name.
         """
-        if not self.middle_name:
-            return None
-        comps = [getattr(self, x) for x in VAR_NAME_COMPS if getattr(self, x)]
-        # add comma before name suffix, if exists
-        if self.suffix:
-            assert len(comps) > 1
-            comps[-2] += ','
-        return ' '.join(comps)
+        return self.all_names[2]
 
     @property
     def alt_full_name(self) -> str:
         """ Alternate construction of person's name, leading with last name.
         """
-        comps = [getattr(self, x) for x in ALT_NAME_COMPS if getattr(self, x)]
-        # add comma after last name, or suffix (if exists)
-        if self.last_name and len(comps) > 1:
-            if not self.suffix:
-                comps[0] += ','
-            elif self.suffix and len(comps) > 2:
-                comps[1] += ','
-        return ' '.join(comps)
+        return self.all_names[3]
 
     @property
     def alt_short_name(self) -> str:
         """ Short(er) construction of "alt" name, omitting middle_name.
         """
-        if not self.first_name:
-            return None
-        comps = [getattr(self, x) for x in ALT_SH_NAME_COMPS if getattr(self, x)]
-        # add comma after last name, or suffix (if exists)
-        if self.last_name and len(comps) > 1:
-            if not self.suffix:
-                comps[0] += ','
-            elif self.suffix and len(comps) > 2:
-                comps[1] += ','
-        return ' '.join(comps)
+        return self.all_names[4]
 
     @property
     def alt_var_name(self) -> str:
         """ Variant short(er) construction of "alt" name, omitting first_name.
         """
-        if not self.middle_name:
-            return None
-        comps = [getattr(self, x) for x in ALT_VAR_NAME_COMPS if getattr(self, x)]
-        # add comma after last name, or suffix (if exists)
-        if self.last_name and len(comps) > 1:
-            if not self.suffix:
-                comps[0] += ','
-            elif self.suffix and len(comps) > 2:
-                comps[1] += ','
-        return ' '.join(comps)
+        return self.all_names[5]
 
-    def save(self, *args, **kwargs):
-        if not self.name:
-            self.name = self.full_name
-        if not self.alt_name:
-            alt_name = self.alt_full_name
+    def set_names(self) -> None:
+        """Set `name` and `alt_name` from the name components (if not already set).  This
+        is called by `save()`, but must be called explicitly for bulk inserts.
+
+        Note that `alt_name` is left null if it is the same as `name`, so we only rebuild
+        it if any of the name components have changed (i.e. not on every re-save).
+        """
+        set_name = not self.name
+        set_alt_name = not self.alt_name and not self._dirty.isdisjoint(NAME_COMPS_SET)
+        if not (set_name or set_alt_name):
+            return
+        # read the name components (and build the names) only once for both
+        names = self.all_names
+        if set_name:
+            self.name = names[0]
+        if set_alt_name:
+            alt_name = names[ALT_VARIANT_START]
             if alt_name != self.name:
                 self.alt_name = alt_name
-        return super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.set_names()
+        # note that tag rows are only synced if `tags` was assigned or modified in place
+        # (and never for new persons without tags)
+        tags_field = self._meta.fields['tags']
+        if self.id is None and not self.tags or not tags_field.is_modified(self):
+            return super().save(*args, **kwargs)
+        with db.atomic():
+            ret = super().save(*args, **kwargs)
+            PersonTag.sync(self)
+        tags_field.reset_modified(self)
+        return ret
+
+    @classmethod
+    def bulk_insert(cls, rows: Iterable[dict], batch_size: int = None,
+                    ignore_conflicts: bool = False) -> int:
+        """Extends `BaseModel.bulk_insert()` to also build `PersonTag` rows for persons with
+        tags (from the stored `Person.tags`, since rows may be ignored as conflicts).
+        """
+        rows = list(rows)
+        with db.atomic():
+            count = super().bulk_insert(rows, batch_size, ignore_conflicts)
+            keys = set()
+            for row in rows:
+                if row.get('tags'):
+                    row = cls.prep_bulk_row(row)
+                    keys.add((row['name'], row.get('disamb') or ''))
+            if keys:
+                persons = []
+                for names in chunked({name for name, _ in keys}, SQLITE_MAX_VARS):
+                    query = (cls.select(cls.id, cls.name, cls.disamb, cls.tags)
+                             .where(cls.name.in_(names)))
+                    persons += [p for p in query if (p.name, p.disamb) in keys]
+                PersonTag.rebuild(persons)
+        return count
+
+    @classmethod
+    def prep_bulk_row(cls, row: dict) -> dict:
+        row = super().prep_bulk_row(row)
+        for attr in row.keys() & PERSON_FLAG_ATTRS.keys():
+            flag = PERSON_FLAG_ATTRS[attr]
+            flags = row.get('flags') or 0
+            row['flags'] = flags | flag if row.pop(attr) else flags & ~flag
+        if not (row.get('name') and row.get('alt_name')):
+            person = cls(**row)
+            person.set_names()
+            row['name'] = person.name
+            row['alt_name'] = person.alt_name
+        return row
+
+    @classmethod
+    def with_canonical_and_metas(cls, query: ModelSelect = None) -> list['Person']:
+        """Return persons for the specified query (default: all), with the canonical person
+        (`cnl_person_id`) and `person_metas` eagerly loaded.  This should be used (rather
+        than iterating over an ad hoc query) when accessing either for multiple persons,
+        since it executes a fixed number of queries (rather than one or two per person).
+        """
+        canonical = cls.alias()
+        if query is None:
+            query = cls.select()
+        query = (query
+                 .select_extend(canonical)
+                 .join(canonical, JOIN.LEFT_OUTER, on=(cls.cnl_person_id == canonical.id))
+                 .switch(cls))
+        return prefetch(query, PersonMeta.select())
+
+#############
+# PersonFTS #
+#############
+
+class PersonFTS(FTS5Model):
+    """Full-text index on person names (external content table, maintained by triggers on
+    `Person`).  Note that diacritics are folded for both indexing and matching.  Use
+    `search_persons()` to query for persons by name.
+    """
+    name          = SearchField()
+    alt_name      = SearchField()
+
+    class Meta:
+        database   = db
+        table_name = 'person_fts'
+        options    = {'content':       'person',
+                      'content_rowid': 'id',
+                      'tokenize':      'unicode61 remove_diacritics 2'}
+
+    # note that the index is rebuilt from existing `person` rows when (re-)created
+    EXTRA_DDL = [
+        "CREATE TRIGGER IF NOT EXISTS person_fts_ai AFTER INSERT ON person BEGIN "
+        "INSERT INTO person_fts (rowid, name, alt_name) "
+        "VALUES (new.id, new.name, new.alt_name); END",
+        "CREATE TRIGGER IF NOT EXISTS person_fts_ad AFTER DELETE ON person BEGIN "
+        "INSERT INTO person_fts (person_fts, rowid, name, alt_name) "
+        "VALUES ('delete', old.id, old.name, old.alt_name); END",
+        "CREATE TRIGGER IF NOT EXISTS person_fts_au AFTER UPDATE OF name, alt_name ON person BEGIN "
+        "INSERT INTO person_fts (person_fts, rowid, name, alt_name) "
+        "VALUES ('delete', old.id, old.name, old.alt_name); "
+        "INSERT INTO person_fts (rowid, name, alt_name) "
+        "VALUES (new.id, new.name, new.alt_name); END",
+        "INSERT INTO person_fts (person_fts) VALUES ('rebuild')"
+    ]
+
+    @classmethod
+    def search_persons(cls, query: str) -> ModelSelect:
+        """Return query for persons matching the specified full-text search ``query``
+        (against `name` or `alt_name`), ordered by relevance.
+        """
+        return (Person
+                .select()
+                .join(cls, on=(Person.id == cls.rowid))
+                .where(cls.match(query))
+                .order_by(cls.bm25()))
 
 ##############
 # PersonMeta #
 ##############
 
-class PersonMeta(BaseModel):
+class PersonMeta(SourcedModel):
     """Represents metainformation (additional field values) for a person
     """
-    person        = ForeignKeyField(Person, backref='person_metas')
+    person        = ForeignKeyField(Person, backref='person_metas', lazy_load=False)
     key           = TextField()
     value         = TextField(null=True)
-    source        = TextField(null=True)
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
 
     class Meta:
@@ -187,19 +508,68 @@ class PersonMeta(BaseModel):
             (('person', 'key', 'source'), True),
         )
 
+#############
+# PersonTag #
+#############
+
+class PersonTag(BaseModel):
+    """Represents a tag for a person (normalized from `Person.tags`, so that persons can
+    be selected by tag using an index).  Rows are kept in sync with `Person.tags` by
+    `Person.save()` and `Person.bulk_insert()` (see `sync()` and `rebuild()`).
+    """
+    # note that the primary key covers lookups by person
+    person        = ForeignKeyField(Person, backref='tag_rows', index=False,
+                                    on_delete='CASCADE')
+    tag           = TextField()
+
+    class Meta:
+        primary_key = CompositeKey('person', 'tag')
+        indexes = (
+            (('tag', 'person'), False),
+        )
+
+    @classmethod
+    def sync(cls, person: Person) -> None:
+        """Update tag rows for the specified person to match `Person.tags` (nothing is
+        written if already in sync).
+        """
+        tags = set(person.tags or [])
+        query = cls.select(cls.tag).where(cls.person == person.id)
+        cur_tags = {tag for (tag,) in query.tuples()}
+        if tags == cur_tags:
+            return
+        with db.atomic():
+            if old_tags := cur_tags - tags:
+                (cls.delete()
+                 .where(cls.person == person.id, cls.tag.in_(old_tags))
+                 .execute())
+            cls.bulk_insert({'person': person.id, 'tag': tag} for tag in tags - cur_tags)
+
+    @classmethod
+    def rebuild(cls, persons: Iterable[Person]) -> None:
+        """Replace tag rows for the specified persons (with `id` and `tags` loaded) based on
+        their current `Person.tags`.
+        """
+        persons = list(persons)
+        rows = [{'person': p.id, 'tag': tag} for p in persons for tag in set(p.tags or [])]
+        with db.atomic():
+            for person_ids in chunked([p.id for p in persons], SQLITE_MAX_VARS):
+                cls.delete().where(cls.person.in_(person_ids)).execute()
+            cls.bulk_insert(rows)
+
 ##############
 # PersonName #
 ##############
 
-class PersonName(BaseModel):
+class PersonName(SourcedModel):
     """Represents a person name
     """
     name_str      = TextField()           # raw name string (no fixup)
-    name_str_norm = TextField(index=True)
+    name_str_norm = TextField()           # indexed below
     name_type     = TextField(null=True)
-    source        = TextField(default='')
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
-    person        = ForeignKeyField(Person, null=True, backref='person_names')
+    person        = ForeignKeyField(Person, null=True, backref='person_names', lazy_load=False)
     person_res    = TextField(null=True)  # person resolution mechanism (or process?)
 
     class Meta:
@@ -209,16 +579,57 @@ class PersonName(BaseModel):
             (('name_str', 'source'), True),
         )
 
+    # covering index for lookups by normalized name (replaces simple index on the column)
+    EXTRA_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS person_name_norm_covering "
+        "ON person_name (name_str_norm, person_id)"
+    ]
+
     def save(self, *args, **kwargs):
         if 'name_str' in self._dirty:
-            self.name_str_norm = norm(self.name_str)
+            self.name_str_norm = norm_cached(self.name_str)
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def prep_bulk_row(cls, row: dict) -> dict:
+        row = super().prep_bulk_row(row)
+        if not row.get('name_str_norm'):
+            row['name_str_norm'] = norm_cached(row['name_str'])
+        return row
+
+    # fields written by `raw_bulk_insert` (in column order)
+    RAW_INSERT_FIELDS = ('name_str', 'name_str_norm', 'name_type', 'source', 'source_date',
+                         'person', 'person_res', 'created_at', 'updated_at')
+
+    @classmethod
+    def raw_bulk_insert(cls, rows: Iterable[dict]) -> int:
+        """Same as `bulk_insert` (with ``ignore_conflicts``), except that rows are inserted
+        using `executemany` directly, bypassing peewee field conversion (which is significant
+        for this high-volume table).  Note that row values must already be in storage form
+        (e.g. person ID, rather than `Person` instance), except for source names, which are
+        converted by `prep_bulk_row()`.  Return the number of rows processed.
+        """
+        fields = [cls._meta.fields[name] for name in cls.RAW_INSERT_FIELDS]
+        defaults = [f.default() if callable(f.default) else f.default for f in fields]
+        params = []
+        for row in cls.resolve_sources(rows):
+            row = cls.prep_bulk_row(row)
+            params.append(tuple(row.get(f.name, dflt) for f, dflt in zip(fields, defaults)))
+        if not params:
+            return 0
+
+        cols = ', '.join(f.column_name for f in fields)
+        vals = ', '.join('?' * len(fields))
+        sql = f"INSERT OR IGNORE INTO {cls._meta.table_name} ({cols}) VALUES ({vals})"
+        with db.atomic():
+            db.connection().executemany(sql, params)
+        return len(params)
+
 ########
 # Work #
 ########
 
-class Work(BaseModel):
+class Work(SourcedModel):
     """Represents a composition
     """
     composer      = ForeignKeyField(Person, backref='works')
@@ -239,7 +650,7 @@ class Work(BaseModel):
     cnl_person_id = ForeignKeyField('self', null=True, backref='aliases')  # points to self, if canonical
 
     # reference info
-    source        = TextField(null=True)
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
     notes         = TextField(null=True)
 
@@ -250,6 +661,13 @@ class Work(BaseModel):
             (('composer', 'name', 'disamb'), True),
         )
 
+    # covering index for the typical lookup by composer + type/catalog number (note that
+    # `id` is the rowid, so is implicitly included)
+    EXTRA_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS work_lookup_cov "
+        "ON work (composer_id, work_type, catalog_no, name)"
+    ]
+
     @property
     def full_name(self) -> str:
         """ Construct full name from individual identifying components.
@@ -258,7 +676,7 @@ class Work(BaseModel):
         return self.work_title
 
     def save(self, *args, **kwargs):
-        if not self.name:
+        if not self.name and 'work_title' in self._dirty:
             self.name = self.full_name
         return super().save(*args, **kwargs)
 
@@ -266,13 +684,13 @@ class Work(BaseModel):
 # WorkMeta #
 ############
 
-class WorkMeta(BaseModel):
+class WorkMeta(SourcedModel):
     """Represents metainformation (additional field values) for a work (composition)
     """
     work          = ForeignKeyField(Work, backref='work_metas')
     key           = TextField()
     value         = TextField(null=True)
-    source        = TextField(null=True)
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
 
     class Meta:
@@ -286,11 +704,11 @@ class WorkMeta(BaseModel):
 # WorkName #
 ##############
 
-class WorkName(BaseModel):
+class WorkName(SourcedModel):
     """Represents the string used to identify a work (composition)
     """
     name_str      = TextField()           # raw name string (no fixup)
-    source        = TextField(default='')
+    source        = SourceField(null=True)
     source_date   = DateField(null=True)
     work          = ForeignKeyField(Work, null=True, backref='person_names')
     work_res      = TextField(null=True)  # work resolution mechanism (or process?)
@@ -311,7 +729,8 @@ class Conflict(BaseModel):
     """
     entity_name = TextField()
     entity_str  = TextField()                # raw name string (no fixup)
-    entity_info = JSONField()                # entity attributes (plus ctx/metainfo)
+    entity_info = JSONField(json_dumps=json_dumps,
+                            json_loads=json_loads)  # entity attributes (plus ctx/metainfo)
     operation   = TextField()
     reason      = TextField(null=True)
     status      = TextField(default='open')  # 'open', 'in process, 'resolved', 'withdrawn'
@@ -331,7 +750,8 @@ class Failure(BaseModel):
     """
     entity_name = TextField()
     entity_str  = TextField()                # raw name string (no fixup)
-    entity_info = JSONField()                # relevant ctx and metainfo (if any)
+    entity_info = JSONField(json_dumps=json_dumps,
+                            json_loads=json_loads)  # relevant ctx and metainfo (if any)
     operation   = TextField()
     reason      = TextField(null=True)
     status      = TextField(default='open')  # 'open', 'in process, 'resolved', 'withdrawn'
@@ -346,8 +766,11 @@ class Failure(BaseModel):
 # create #
 ##########
 
-ALL_MODELS = [Person,
+ALL_MODELS = [Source,
+              Person,
+              PersonFTS,
               PersonMeta,
+              PersonTag,
               PersonName,
               Conflict,
               Failure,
@@ -355,8 +778,12 @@ ALL_MODELS = [Person,
               WorkMeta,
               WorkName]
 
+MODELS_BY_NAME = {model.__name__: model for model in ALL_MODELS}
+
 def create(models: list[str] | str = 'all', force: bool = False, **kwargs) -> None:
-    """Create tables for the specified schema models.
+    """Create tables for the specified schema models.  Note that connection-level settings
+    (WAL journaling, cache and mmap sizes, etc.) are not managed here--they are applied as
+    pragmas by `dbcore.db` on every connect (see `DFLT_PRAGMAS`, overridable in config).
     """
     if kwargs:
         raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
@@ -370,27 +797,48 @@ def create(models: list[str] | str = 'all', force: bool = False, **kwargs) -> No
     if isinstance(models[0], str):
         models_new = []
         for model in models:
-            if model not in globals():
-                raise RuntimeError(f"Model {model} not imported")
-            model_obj = globals()[model]
-            if not issubclass(model_obj, BaseModel):
-                raise RuntimeError(f"Model {model} must be subclass of `BaseModel`")
-            models_new.append(model_obj)
+            if model not in MODELS_BY_NAME:
+                raise RuntimeError(f"Model {model} not known")
+            models_new.append(MODELS_BY_NAME[model])
         models = models_new
 
     if db.is_closed():
         db.connect()
-    for model in models:
-        try:
-            model.create_table(safe=False)
-            log.info(f"Created table {model._meta.table_name}")
-        except OperationalError as e:
-            if re.fullmatch(r'table "(\w+)" already exists', str(e)) and force:
-                model.drop_table(safe=False)
+    # note that creating a table that already exists (without `force`) is an error, which
+    # is raised by `create_table` (and rolls back the entire operation, since all of the
+    # DDL is executed in a single transaction)
+    existing = set(db.get_tables())
+    dropped = [m for m in models if m._meta.table_name in existing] if force else []
+    # note that foreign key enforcement must be turned off for dropping tables that are
+    # still referenced by other tables (and cannot be changed within a transaction)
+    fk_pragma = db.pragma('foreign_keys')
+    if dropped:
+        db.pragma('foreign_keys', 0)
+    try:
+        with db.atomic():
+            # tables are dropped in reverse dependency order
+            db.drop_tables(dropped, safe=False)
+            for model in models:
+                table_name = model._meta.table_name
                 model.create_table(safe=False)
-                log.info(f"Re-created table {model._meta.table_name}")
-            else:
-                raise
+                if model in dropped:
+                    log.info(f"Re-created table {table_name}")
+                else:
+                    log.info(f"Created table {table_name}")
+                # note that non-`BaseModel` models (e.g. `PersonFTS`) may omit either list
+                extra_ddl = (getattr(model, 'EXTRA_INDEXES', []) +
+                             getattr(model, 'EXTRA_DDL', []))
+                for ddl in extra_ddl:
+                    db.execute_sql(ddl)
+            # the full-text index triggers are defined on `person`, so must be recreated
+            # (and the index rebuilt) if `Person` is created on its own
+            if Person in models and PersonFTS not in models and PersonFTS.table_exists():
+                for ddl in PersonFTS.EXTRA_DDL:
+                    db.execute_sql(ddl)
+    finally:
+        if dropped:
+            db.pragma('foreign_keys', fk_pragma)
+    Source.clear_cache()
 
 ########
 # main #
@@ -398,9 +846,151 @@ def create(models: list[str] | str = 'all', force: bool = False, **kwargs) -> No
 
 import sys
 
-from ckautils import parse_argv
+###########
+# migrate #
+###########
+
+def migrate_flags(**kwargs) -> None:
+    """Convert legacy boolean flag columns in `person` (e.g. `is_composer`) to the `flags`
+    bitmask column.  Nothing is done if the table has already been converted.
+    """
+    if kwargs:
+        raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
+
+    if db.is_closed():
+        db.connect()
+    cols = {col.name for col in db.get_columns(Person._meta.table_name)}
+    if 'flags' in cols:
+        log.info("Table person already has flags column")
+        return
+
+    # note that legacy column names are the same as the current property names
+    flags_expr = ' | '.join(f"(CASE WHEN {col} THEN {flag:d} ELSE 0 END)"
+                            for col, flag in PERSON_FLAG_ATTRS.items())
+    with db.atomic():
+        # partial indexes on the legacy columns must be dropped before the columns
+        for idx in db.get_indexes(Person._meta.table_name):
+            if idx.name in ('person_canonical_name', 'person_composer_name',
+                            'person_conductor_name', 'person_performer_name'):
+                db.execute_sql(f"DROP INDEX {idx.name}")
+        db.execute_sql("ALTER TABLE person ADD COLUMN flags INTEGER NOT NULL DEFAULT 0")
+        db.execute_sql(f"UPDATE person SET flags = {flags_expr}")
+        for col in PERSON_FLAG_ATTRS:
+            db.execute_sql(f"ALTER TABLE person DROP COLUMN {col}")
+        for index_ddl in Person.EXTRA_INDEXES:
+            db.execute_sql(index_ddl)
+    log.info("Converted legacy flag columns in person to flags")
+
+def migrate_msgpack(**kwargs) -> None:
+    """Convert legacy JSON text values in `person` (`tags` and `notes`) to msgpack (see
+    `MsgPackField`).  Rows that have already been converted are skipped.
+    """
+    if kwargs:
+        raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
+
+    if db.is_closed():
+        db.connect()
+    cursor = db.execute_sql("SELECT id, tags, notes FROM person "
+                            "WHERE typeof(tags) = 'text' OR typeof(notes) = 'text'")
+    rows = cursor.fetchall()
+    with db.atomic():
+        for person_id, tags, notes in rows:
+            (Person.update(tags=Person.tags.python_value(tags),
+                           notes=Person.notes.python_value(notes))
+             .where(Person.id == person_id)
+             .execute())
+    log.info(f"Converted tags/notes to msgpack for {len(rows)} rows in person")
+
+def migrate_sources(**kwargs) -> None:
+    """Convert legacy text `source` columns to references to the `Source` lookup table
+    (populated from the distinct existing values).  Tables that have already been converted
+    are skipped.
+    """
+    if kwargs:
+        raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
+
+    if db.is_closed():
+        db.connect()
+    existing = set(db.get_tables())
+    with db.atomic():
+        Source.create_table(safe=True)
+        for model in ALL_MODELS:
+            table_name = model._meta.table_name
+            if not isinstance(model._meta.fields.get('source'), SourceField):
+                continue
+            if table_name not in existing:
+                continue
+            cols = {col.name for col in db.get_columns(table_name)}
+            if 'source' not in cols:
+                log.info(f"Table {table_name} already converted")
+                continue
+
+            # note that empty source names (legacy default) are converted to null
+            now = now_str()
+            db.execute_sql(f"INSERT OR IGNORE INTO source (name, created_at, updated_at) "
+                           f"SELECT DISTINCT source, ?, ? FROM {table_name} "
+                           f"WHERE source IS NOT NULL AND source != ''", (now, now))
+            # indexes on the legacy column must be dropped before the column
+            for idx in db.get_indexes(table_name):
+                if 'source' in idx.columns:
+                    db.execute_sql(f"DROP INDEX {idx.name}")
+            db.execute_sql(f"ALTER TABLE {table_name} "
+                           f"ADD COLUMN source_id INTEGER REFERENCES source (id)")
+            db.execute_sql(f"UPDATE {table_name} SET source_id = "
+                           f"(SELECT id FROM source WHERE source.name = {table_name}.source)")
+            db.execute_sql(f"ALTER TABLE {table_name} DROP COLUMN source")
+            model._schema.create_indexes(safe=True)
+            log.info(f"Converted source column in {table_name}")
+    Source.clear_cache()
+
+def migrate_tags(**kwargs) -> None:
+    """(Re-)build the `person_tag` table (in the current layout, e.g. with cascading
+    deletes) from `Person.tags` for all persons.
+    """
+    if kwargs:
+        raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
+
+    if db.is_closed():
+        db.connect()
+    query = Person.select(Person.id, Person.tags)
+    rows = [{'person': person.id, 'tag': tag}
+            for person in query.iterator() for tag in set(person.tags or [])]
+    with db.atomic():
+        PersonTag.drop_table(safe=True)
+        PersonTag.create_table()
+        PersonTag.bulk_insert(rows)
+    log.info(f"Rebuilt person_tag ({len(rows)} rows)")
+
+def migrate_indexes(**kwargs) -> None:
+    """Create any missing indexes (both regular model indexes and `EXTRA_INDEXES`) for
+    existing tables.  This should be run after the other migrate actions, since indexes may
+    depend on converted columns (e.g. `person.flags`).
+    """
+    if kwargs:
+        raise RuntimeError(f"Unexpected argument(s): {', '.join(kwargs.keys())}")
 
-ACTIONS = {'create': create}
+    if db.is_closed():
+        db.connect()
+    existing = set(db.get_tables())
+    with db.atomic():
+        for model in ALL_MODELS:
+            table_name = model._meta.table_name
+            if not issubclass(model, BaseModel) or table_name not in existing:
+                continue
+            before = {idx.name for idx in db.get_indexes(table_name)}
+            model._schema.create_indexes(safe=True)
+            for index_ddl in model.EXTRA_INDEXES:
+                db.execute_sql(index_ddl)
+            added = {idx.name for idx in db.get_indexes(table_name)} - before
+            if added:
+                log.info(f"Created index(es) for {table_name}: {', '.join(sorted(added))}")
+
+ACTIONS = {'create':          create,
+           'migrate_flags':   migrate_flags,
+           'migrate_msgpack': migrate_msgpack,
+           'migrate_sources': migrate_sources,
+           'migrate_tags':    migrate_tags,
+           'migrate_indexes': migrate_indexes}
 
 def main() -> int:
     """Usage::
@@ -411,6 +1001,16 @@ def main() -> int:
 
       - create models=<models> force=<bool>
 
+      - migrate_flags
+
+      - migrate_msgpack
+
+      - migrate_sources
+
+      - migrate_tags
+
+      - migrate_indexes
+
     where:
 
       - <models> is a comma-separate list of model names (case-sensitive), or 'all'
@@ -425,6 +1025,7 @@ def main() -> int:
         return -1
 
     util_func = ACTIONS[sys.argv[1]]
+    from ckautils import parse_argv
     args, kwargs = parse_argv(sys.argv[2:])
     if args:
         print(f"Unexpected argument(s): {', '.join(args)}", file=sys.stderr)